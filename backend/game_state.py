@@ -1,33 +1,96 @@
 import random
-import copy
-from typing import List, Dict, Tuple, Optional, Set
-from dataclasses import dataclass, field
-from enum import Enum
-import config
+from collections import deque
+from functools import lru_cache
+import numpy as np
+from typing import List, Dict, Tuple, Optional, Set, FrozenSet, Union, NamedTuple, Deque
+from dataclasses import dataclass
+from enum import Enum, IntEnum
+from config import CFG
 
-class CellType(Enum):
-    EMPTY = "empty"
-    WALL = "wall"
-    DOOR = "door"
-    WINDOW = "window"
-    TREE = "tree"
-    FUEL_STATION = "fuel_station"
-    LIGHT_NODE = "light_node"
+class CellType(IntEnum):
+    """Cell codes stored in the grid array; compare as plain ints"""
+    EMPTY = 0
+    WALL = 1
+    DOOR = 2
+    WINDOW = 3
+    TREE = 4
+    FUEL_STATION = 5
+    LIGHT_NODE = 6
+
+# Bare int aliases for hot paths (skip the enum attribute lookup)
+EMPTY, WALL, DOOR, WINDOW, TREE, FUEL_STATION, LIGHT_NODE = (int(cell) for cell in CellType)
+# JSON names of the cell codes
+CELL_NAMES = tuple(cell.name.lower() for cell in CellType)
+# Bit set of the cell codes that block line of sight: (BLOCKS_SIGHT >> cell) & 1
+BLOCKS_SIGHT = (1 << WALL) | (1 << TREE)
+
+class Action(IntEnum):
+    """AI action types; compare as plain ints"""
+    MOVE = 0
+    REFUEL = 1
+    CONTROL_NODE = 2
+    WAIT = 3
+
+# Module-level aliases for hot paths (skip the enum attribute lookup)
+MOVE, REFUEL, CONTROL_NODE, WAIT = Action
 
 class AgentType(Enum):
     STRATEGIST = "strategist"  # Unit S - Minimax
     INSTINCT = "instinct"  # Unit I - MCTS
 
-@dataclass
-class Position:
+# Agent order used by the flat arrays of GameState.to_arrays(); node owners
+# are encoded as an index into it, or NO_OWNER for free nodes
+AGENT_ORDER = (AgentType.STRATEGIST, AgentType.INSTINCT)
+AGENT_INDEX = {agent_type: i for i, agent_type in enumerate(AGENT_ORDER)}
+NO_OWNER = -1
+
+OPPONENT = {AgentType.STRATEGIST: AgentType.INSTINCT, AgentType.INSTINCT: AgentType.STRATEGIST}
+
+def pkey(x: int, y: int) -> int:
+    """Pack grid coordinates into a single integer key (y * GRID_SIZE + x)"""
+    return y * CFG.GRID_SIZE + x
+
+# Pairwise Manhattan distances between packed positions: DIST[a, b]. The
+# NumPy table serves vectorized queries (e.g. DIST[pos, station_keys].min()),
+# DIST_ROWS is the same table as nested lists for cheap scalar lookups.
+_ys, _xs = np.divmod(np.arange(CFG.GRID_SIZE * CFG.GRID_SIZE), CFG.GRID_SIZE)
+DIST = (np.abs(_xs[:, None] - _xs[None, :]) + np.abs(_ys[:, None] - _ys[None, :])).astype(np.uint8)
+DIST_ROWS = DIST.tolist()
+del _xs, _ys
+
+# Zobrist keys for search hashing, as nested lists of Python ints (XOR on
+# NumPy scalars is slow). Fixed seed, so hashes are the same every run.
+_zobrist_rng = np.random.default_rng(0x5EED)
+def _zobrist_table(*shape) -> list:
+    return _zobrist_rng.integers(1, 2 ** 63, size=shape, dtype=np.int64).tolist()
+ZOBRIST_POS = _zobrist_table(2, CFG.GRID_SIZE ** 2)  # [agent index][pos]
+ZOBRIST_FUEL = _zobrist_table(2, CFG.MAX_FUEL + 1)  # [agent index][fuel]
+ZOBRIST_OWNER = _zobrist_table(CFG.GRID_SIZE ** 2, 3)  # [node pos][owner index + 1]
+ZOBRIST_STATION = _zobrist_table(CFG.GRID_SIZE ** 2, CFG.FUEL_STATION_INITIAL + 1)  # [station pos][fuel]
+ZOBRIST_SIDE = _zobrist_table(1)[0]  # Instinct to move
+del _zobrist_rng
+
+@lru_cache(maxsize=4096)
+def nearest_distances(targets: Union[Tuple[int, ...], FrozenSet[int]]) -> List[int]:
+    """
+    Distance from every position to the nearest of `targets` (non-empty),
+    one vectorized min over DIST rows, cached per target set
+    """
+    return DIST[list(targets)].min(axis=0).tolist()
+
+class Position(NamedTuple):
+    """Grid coordinate, only used at API/JSON boundaries (hot paths use pkey ints)"""
     x: int
     y: int
     
-    def __eq__(self, other):
-        return self.x == other.x and self.y == other.y
+    @classmethod
+    def from_key(cls, key: int) -> 'Position':
+        y, x = divmod(key, CFG.GRID_SIZE)
+        return cls(x, y)
     
-    def __hash__(self):
-        return hash((self.x, self.y))
+    @property
+    def key(self) -> int:
+        return pkey(self.x, self.y)
     
     def distance_to(self, other: 'Position') -> int:
         """Manhattan distance"""
@@ -37,265 +100,335 @@ class Position:
         """Check if positions are adjacent (not diagonal)"""
         return self.distance_to(other) == 1
 
-@dataclass
+@dataclass(slots=True)
 class Agent:
     agent_type: AgentType
-    position: Position
+    pos: int  # Packed position key, see pkey()
     fuel: int
     nodes_controlled: int = 0
     score: int = 0
     
+    @property
+    def position(self) -> Position:
+        return Position.from_key(self.pos)
+    
     def __repr__(self):
-        return f"{self.agent_type.value}@({self.position.x},{self.position.y})"
+        position = self.position
+        return f"{self.agent_type.value}@({position.x},{position.y})"
 
-@dataclass
+@dataclass(slots=True)
 class FuelStation:
-    position: Position
+    pos: int
     fuel_remaining: int
     is_active: bool = True
     respawn_counter: int = 0
     
+    @property
+    def position(self) -> Position:
+        return Position.from_key(self.pos)
+    
     def is_depleted(self) -> bool:
         return self.fuel_remaining <= 0
 
-@dataclass
+@dataclass(slots=True)
 class LightNode:
-    position: Position
+    pos: int
     controlled_by: Optional[AgentType] = None
     
+    @property
+    def position(self) -> Position:
+        return Position.from_key(self.pos)
+    
     def is_controlled(self) -> bool:
         return self.controlled_by is not None
 
 class GameState:
-    def __init__(self):
-        self.grid_size = config.GRID_SIZE
+    # Line-of-sight tables, only built when a line-of-sight check first needs
+    # them (see line_of_sight_tables()); search copies never carry them
+    clear_runs: Optional[Tuple[List[int], ...]] = None
+    los_cache: Optional[Dict[int, bool]] = None
+    
+    def __init__(self, seed: Optional[int] = None, record_history: bool = True):
+        self.grid_size = CFG.GRID_SIZE
         self.turn = 0
-        self.max_turns = config.MAX_TURNS
+        self.max_turns = CFG.MAX_TURNS
         self.current_player = AgentType.STRATEGIST
         
-        # Initialize grid
-        self.grid: List[List[CellType]] = [[CellType.EMPTY for _ in range(self.grid_size)] 
-                                            for _ in range(self.grid_size)]
+        # Map generation RNG (follows the global `random` seed unless given one)
+        self.rng = np.random.default_rng(random.getrandbits(64) if seed is None else seed)
+        
+        # Initialize grid (cell codes, indexed [y, x])
+        self.grid = np.zeros((self.grid_size, self.grid_size), dtype=np.uint8)
         
         # Game entities
         self.agents: Dict[AgentType, Agent] = {}
         self.fuel_stations: List[FuelStation] = []
         self.light_nodes: List[LightNode] = []
-        self.doors_open: Set[Position] = set()
+        self.doors_open: Set[int] = set()
+        
+        # O(1) lookups by packed position (lists above keep JSON ordering)
+        self.station_by_pos: Dict[int, FuelStation] = {}
+        self.node_by_pos: Dict[int, LightNode] = {}
         
-        # History
-        self.action_history: List[Dict] = []
+        # Positions of the light nodes nobody controls yet. Replaced (never
+        # mutated) whenever a node changes hands, so copies can share it and
+        # it can key nearest_distances()
+        self.unclaimed_nodes: FrozenSet[int] = frozenset()
+        
+        # Recent actions only (disabled on search clones)
+        self.record_history = record_history
+        self.action_history: Deque[Dict] = deque(maxlen=CFG.ACTION_HISTORY_LENGTH)
         
         # Initialize game
         self._initialize_game()
+        
+        # Search hash, see compute_zobrist()
+        self.zobrist = self.compute_zobrist()
     
     def _initialize_game(self):
         """Set up the initial game state"""
         # Place agents in opposite corners
         self.agents[AgentType.STRATEGIST] = Agent(
             agent_type=AgentType.STRATEGIST,
-            position=Position(1, 1),
-            fuel=config.INITIAL_FUEL
+            pos=pkey(1, 1),
+            fuel=CFG.INITIAL_FUEL
         )
         self.agents[AgentType.INSTINCT] = Agent(
             agent_type=AgentType.INSTINCT,
-            position=Position(self.grid_size - 2, self.grid_size - 2),
-            fuel=config.INITIAL_FUEL
+            pos=pkey(self.grid_size - 2, self.grid_size - 2),
+            fuel=CFG.INITIAL_FUEL
         )
         
         # Generate environment (only walls now, removed doors/windows/trees)
         self._generate_walls()
         self._generate_fuel_stations()
         self._generate_light_nodes()
+        
+        self._build_adjacency()
     
-    def _is_valid_position(self, pos: Position) -> bool:
-        """Check if position is within grid bounds"""
-        return 0 <= pos.x < self.grid_size and 0 <= pos.y < self.grid_size
+    def _is_valid_position(self, x: int, y: int) -> bool:
+        """Check if coordinates are within grid bounds"""
+        return 0 <= x < self.grid_size and 0 <= y < self.grid_size
     
-    def _is_position_free(self, pos: Position, min_distance: int = 0) -> bool:
-        """Check if position is free for placement with optional spacing"""
-        if not self._is_valid_position(pos):
-            return False
+    def _placement_mask(self, margin: int) -> np.ndarray:
+        """
+        Boolean mask of cells where a new object may go: inside the margin,
+        not on an agent and at least MIN_SPACING away from placed objects
+        """
+        gs = self.grid_size
+        allowed = np.zeros((gs, gs), dtype=bool)
+        allowed[margin:gs - margin, margin:gs - margin] = True
+        
+        for y, x in np.argwhere(self.grid):
+            self._block_spacing(allowed, x, y)
         
-        # Check if agents are here
         for agent in self.agents.values():
-            if agent.position == pos:
-                return False
+            y, x = divmod(agent.pos, gs)
+            allowed[y, x] = False
         
-        # Check if cell is empty
-        if self.grid[pos.y][pos.x] != CellType.EMPTY:
-            return False
+        return allowed
+    
+    def _block_spacing(self, allowed: np.ndarray, x: int, y: int):
+        """Clear the MIN_SPACING square around (x, y) from a placement mask"""
+        d = CFG.MIN_SPACING
+        allowed[max(0, y - d):y + d + 1, max(0, x - d):x + d + 1] = False
+    
+    def _place_objects(self, allowed: np.ndarray, count: int, cell: int) -> List[int]:
+        """Place up to `count` objects on random allowed cells, returning their keys"""
+        placed = []
         
-        # Check spacing from other objects
-        if min_distance > 0:
-            for dy in range(-min_distance, min_distance + 1):
-                for dx in range(-min_distance, min_distance + 1):
-                    check_pos = Position(pos.x + dx, pos.y + dy)
-                    if self._is_valid_position(check_pos):
-                        if self.grid[check_pos.y][check_pos.x] != CellType.EMPTY:
-                            return False
+        for _ in range(count):
+            # Flat indices of the mask are packed position keys
+            candidates = np.flatnonzero(allowed)
+            if len(candidates) == 0:
+                break
+            
+            key = int(candidates[self.rng.integers(len(candidates))])
+            y, x = divmod(key, self.grid_size)
+            self.grid[y, x] = cell
+            self._block_spacing(allowed, x, y)
+            placed.append(key)
         
-        return True
+        return placed
     
     def _generate_walls(self):
         """Generate walls with proper spacing"""
-        placed = 0
-        attempts = 0
-        max_attempts = config.NUM_WALLS * 20
+        allowed = self._placement_mask(margin=3)
         
-        while placed < config.NUM_WALLS and attempts < max_attempts:
-            x, y = random.randint(3, self.grid_size - 4), random.randint(3, self.grid_size - 4)
-            pos = Position(x, y)
-            
-            # Ensure minimum spacing and not near agent spawn points
-            agent_positions = [Position(1, 1), Position(self.grid_size - 2, self.grid_size - 2)]
-            too_close_to_agent = any(pos.distance_to(ap) < config.MIN_AGENT_CLEARANCE 
-                                     for ap in agent_positions)
-            
-            if not too_close_to_agent and self._is_position_free(pos, config.MIN_SPACING):
-                self.grid[y][x] = CellType.WALL
-                placed += 1
-            
-            attempts += 1
+        # Keep walls away from agent spawn points
+        coords = np.arange(self.grid_size)
+        for agent in self.agents.values():
+            ay, ax = divmod(agent.pos, self.grid_size)
+            spawn_distance = np.add.outer(np.abs(coords - ay), np.abs(coords - ax))
+            allowed &= spawn_distance >= CFG.MIN_AGENT_CLEARANCE
+        
+        self._place_objects(allowed, CFG.NUM_WALLS, WALL)
     
     def _generate_fuel_stations(self):
         """Generate fuel stations with proper spacing"""
-        placed = 0
-        attempts = 0
-        max_attempts = config.NUM_FUEL_STATIONS * 20
+        allowed = self._placement_mask(margin=3)
         
-        while placed < config.NUM_FUEL_STATIONS and attempts < max_attempts:
-            x, y = random.randint(3, self.grid_size - 4), random.randint(3, self.grid_size - 4)
-            pos = Position(x, y)
-            
-            # Place fuel stations on grid but allow agents to pass through them
-            if self._is_position_free(pos, config.MIN_SPACING):
-                self.grid[y][x] = CellType.FUEL_STATION
-                self.fuel_stations.append(FuelStation(
-                    position=pos,
-                    fuel_remaining=config.FUEL_STATION_INITIAL
-                ))
-                placed += 1
-            
-            attempts += 1
+        # Place fuel stations on grid but allow agents to pass through them
+        for key in self._place_objects(allowed, CFG.NUM_FUEL_STATIONS, FUEL_STATION):
+            station = FuelStation(pos=key, fuel_remaining=CFG.FUEL_STATION_INITIAL)
+            self.fuel_stations.append(station)
+            self.station_by_pos[key] = station
     
     def _generate_light_nodes(self):
         """Generate light nodes (control points) with proper spacing"""
-        placed = 0
-        attempts = 0
-        max_attempts = config.NUM_LIGHT_NODES * 20
+        allowed = self._placement_mask(margin=2)
         
-        while placed < config.NUM_LIGHT_NODES and attempts < max_attempts:
-            x, y = random.randint(2, self.grid_size - 3), random.randint(2, self.grid_size - 3)
-            pos = Position(x, y)
-            
-            # Place light nodes on grid but allow agents to pass through them
-            if self._is_position_free(pos, config.MIN_SPACING):
-                self.grid[y][x] = CellType.LIGHT_NODE
-                self.light_nodes.append(LightNode(position=pos))
-                placed += 1
-            
-            attempts += 1
+        # Place light nodes on grid but allow agents to pass through them
+        for key in self._place_objects(allowed, CFG.NUM_LIGHT_NODES, LIGHT_NODE):
+            node = LightNode(pos=key)
+            self.light_nodes.append(node)
+            self.node_by_pos[key] = node
+        self.unclaimed_nodes = frozenset(self.node_by_pos)
     
-    def get_possible_moves(self, agent_type: AgentType) -> List[Position]:
-        """Get all valid adjacent moves for an agent"""
-        agent = self.agents[agent_type]
-        moves = []
+    def _build_adjacency(self):
+        """
+        Precompute legal neighbor keys for every cell (walls never move).
+        Doors don't block movement, so no per-call filtering is needed.
+        """
+        gs = self.grid_size
+        cells = self.grid.tolist()
+        self.adj: List[Tuple[int, ...]] = [()] * (gs * gs)
         
-        for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-            new_pos = Position(agent.position.x + dx, agent.position.y + dy)
-            
-            if not self._is_valid_position(new_pos):
-                continue
-            
-            cell_type = self.grid[new_pos.y][new_pos.x]
-            
-            # Can move to any cell except walls
-            # Agents can now pass through fuel stations and light nodes
-            if cell_type != CellType.WALL:
-                moves.append(new_pos)
+        for y in range(gs):
+            for x in range(gs):
+                neighbors = []
+                for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
+                    nx, ny = x + dx, y + dy
+                    
+                    if not self._is_valid_position(nx, ny):
+                        continue
+                    
+                    # Can move to any cell except walls
+                    # Agents can now pass through fuel stations and light nodes
+                    if cells[ny][nx] != WALL:
+                        neighbors.append(pkey(nx, ny))
+                self.adj[pkey(x, y)] = tuple(neighbors)
         
-        return moves
+        # Same table in CSR form for compiled kernels: neighbors of key k are
+        # adj_flat[adj_offsets[k]:adj_offsets[k + 1]]
+        self.adj_flat = np.array([k for neighbors in self.adj for k in neighbors], dtype=np.int32)
+        self.adj_offsets = np.zeros(gs * gs + 1, dtype=np.int32)
+        np.cumsum([len(neighbors) for neighbors in self.adj], out=self.adj_offsets[1:])
     
-    def can_refuel(self, agent_type: AgentType) -> bool:
-        """Check if agent can refuel at current position"""
-        agent = self.agents[agent_type]
+    def _build_clear_runs(self):
+        """
+        Precompute, for every cell, how many see-through cells (not WALL or
+        TREE) follow it in a row going east, west, south (+y) and north, so
+        line-of-sight checks can skip a whole run in one step
+        """
+        gs = self.grid_size
+        cells = self.grid.tolist()
+        clear = [[not (BLOCKS_SIGHT >> cell) & 1 for cell in row] for row in cells]
+        east, west, south, north = runs = tuple([0] * (gs * gs) for _ in range(4))
         
-        for station in self.fuel_stations:
-            if station.position == agent.position and station.is_active and not station.is_depleted():
-                return True
+        for y in range(gs):
+            for x in range(gs - 2, -1, -1):
+                east[pkey(x, y)] = east[pkey(x + 1, y)] + 1 if clear[y][x + 1] else 0
+            for x in range(1, gs):
+                west[pkey(x, y)] = west[pkey(x - 1, y)] + 1 if clear[y][x - 1] else 0
+        for x in range(gs):
+            for y in range(gs - 2, -1, -1):
+                south[pkey(x, y)] = south[pkey(x, y + 1)] + 1 if clear[y + 1][x] else 0
+            for y in range(1, gs):
+                north[pkey(x, y)] = north[pkey(x, y - 1)] + 1 if clear[y - 1][x] else 0
         
-        return False
+        self.clear_runs = runs
+        # Line-of-sight results by position pair, see scoring.has_line_of_sight.
+        # Like the runs they only depend on the grid, so rebuilding the runs
+        # starts a fresh cache
+        self.los_cache = {}
+    
+    def line_of_sight_tables(self) -> Tuple[Tuple[List[int], ...], Dict[int, bool]]:
+        """clear_runs and los_cache, built on first use"""
+        if self.clear_runs is None:
+            self._build_clear_runs()
+        return self.clear_runs, self.los_cache
+    
+    def get_possible_moves(self, agent_type: AgentType) -> Tuple[int, ...]:
+        """Get all valid adjacent moves for an agent as packed positions (shared, immutable)"""
+        return self.adj[self.agents[agent_type].pos]
+    
+    def can_refuel(self, agent_type: AgentType) -> bool:
+        """Check if agent can refuel at current position"""
+        station = self.station_by_pos.get(self.agents[agent_type].pos)
+        return station is not None and station.is_active and not station.is_depleted()
     
     def can_control_node(self, agent_type: AgentType) -> Optional[LightNode]:
         """Check if agent can control a node at current position"""
         agent = self.agents[agent_type]
+        node = self.node_by_pos.get(agent.pos)
         
-        for node in self.light_nodes:
-            if node.position == agent.position:
-                # Empty node - needs 1 fuel
-                if not node.is_controlled() and agent.fuel >= config.FUEL_COST_CONTROL_EMPTY:
+        if node is not None:
+            # Empty node - needs 1 fuel
+            if not node.is_controlled() and agent.fuel >= CFG.FUEL_COST_CONTROL_EMPTY:
+                return node
+            elif node.controlled_by != agent_type:
+                # Opponent's node - needs 2 fuel
+                if agent.fuel >= CFG.FUEL_COST_CAPTURE:
                     return node
-                elif node.controlled_by != agent_type:
-                    # Opponent's node - needs 2 fuel
-                    if agent.fuel >= config.FUEL_COST_CAPTURE:
-                        return node
         
         return None
     
-    def execute_move(self, agent_type: AgentType, target: Position) -> Dict:
-        """Execute a move action"""
+    def execute_move(self, agent_type: AgentType, target: int) -> Dict:
+        """Execute a move action to a packed target position"""
         agent = self.agents[agent_type]
-        old_pos = copy.copy(agent.position)
-        agent.position = target
+        old_pos = agent.position
+        agent.pos = target
         
         # Consume fuel for movement
-        agent.fuel -= config.FUEL_COST_MOVE
+        agent.fuel -= CFG.FUEL_COST_MOVE
         
         action = {
             "type": "move",
             "agent": agent_type.value,
-            "from": {"x": old_pos.x, "y": old_pos.y},
-            "to": {"x": target.x, "y": target.y},
-            "fuel_cost": config.FUEL_COST_MOVE,
+            "from": old_pos._asdict(),
+            "to": agent.position._asdict(),
+            "fuel_cost": CFG.FUEL_COST_MOVE,
             "new_fuel": agent.fuel,
             "turn": self.turn
         }
         
-        self.action_history.append(action)
+        if self.record_history:
+            self.action_history.append(action)
         return action
     
     def execute_refuel(self, agent_type: AgentType) -> Dict:
         """Execute a refuel action"""
         agent = self.agents[agent_type]
+        station = self.station_by_pos.get(agent.pos)
         
-        for station in self.fuel_stations:
-            if station.position == agent.position and station.is_active:
-                # Refuel
-                fuel_gained = min(config.FUEL_REFUEL_AMOUNT, 
-                                 config.MAX_FUEL - agent.fuel,
-                                 station.fuel_remaining)
-                
-                agent.fuel += fuel_gained
-                station.fuel_remaining -= fuel_gained
-                
-                # Deactivate if empty
-                if station.is_depleted():
-                    station.is_active = False
-                    station.respawn_counter = config.FUEL_STATION_RESPAWN_TURNS
-                
-                action = {
-                    "type": "refuel",
-                    "agent": agent_type.value,
-                    "position": {"x": agent.position.x, "y": agent.position.y},
-                    "fuel_gained": fuel_gained,
-                    "new_fuel": agent.fuel,
-                    "station_remaining": station.fuel_remaining,
-                    "turn": self.turn
-                }
-                
+        if station is not None and station.is_active:
+            # Refuel
+            fuel_gained = min(CFG.FUEL_REFUEL_AMOUNT, 
+                             CFG.MAX_FUEL - agent.fuel,
+                             station.fuel_remaining)
+            
+            agent.fuel += fuel_gained
+            station.fuel_remaining -= fuel_gained
+            
+            # Deactivate if empty
+            if station.is_depleted():
+                station.is_active = False
+                station.respawn_counter = CFG.FUEL_STATION_RESPAWN_TURNS
+            
+            action = {
+                "type": "refuel",
+                "agent": agent_type.value,
+                "position": agent.position._asdict(),
+                "fuel_gained": fuel_gained,
+                "new_fuel": agent.fuel,
+                "station_remaining": station.fuel_remaining,
+                "turn": self.turn
+            }
+            
+            if self.record_history:
                 self.action_history.append(action)
-                return action
+            return action
         
         return {"type": "refuel_failed", "agent": agent_type.value}
     
@@ -304,70 +437,67 @@ class GameState:
         agent = self.agents[agent_type]
         
         # Find node at agent's position
-        for node in self.light_nodes:
-            if node.position == agent.position:
-                was_controlled = node.is_controlled()
-                previous_owner = node.controlled_by
-                
-                if not was_controlled:
-                    # Control empty node
-                    agent.fuel -= config.FUEL_COST_CONTROL_EMPTY
-                    node.controlled_by = agent_type
-                    agent.nodes_controlled += 1
-                    
-                    action = {
-                        "type": "control_node",
-                        "agent": agent_type.value,
-                        "position": {"x": node.position.x, "y": node.position.y},
-                        "fuel_cost": config.FUEL_COST_CONTROL_EMPTY,
-                        "new_fuel": agent.fuel,
-                        "turn": self.turn
-                    }
-                elif previous_owner != agent_type:
-                    # Capture opponent's node
-                    agent.fuel -= config.FUEL_COST_CAPTURE
-                    
-                    # Update previous owner
-                    if previous_owner:
-                        self.agents[previous_owner].nodes_controlled -= 1
-                    
-                    node.controlled_by = agent_type
-                    agent.nodes_controlled += 1
-                    
-                    action = {
-                        "type": "capture_node",
-                        "agent": agent_type.value,
-                        "from_agent": previous_owner.value if previous_owner else None,
-                        "position": {"x": node.position.x, "y": node.position.y},
-                        "fuel_cost": config.FUEL_COST_CAPTURE,
-                        "new_fuel": agent.fuel,
-                        "turn": self.turn
-                    }
-                else:
-                    return {"type": "control_failed", "agent": agent_type.value, "reason": "already_controlled"}
-                
-                self.action_history.append(action)
-                return action
+        node = self.node_by_pos.get(agent.pos)
+        if node is None:
+            return {"type": "control_failed", "agent": agent_type.value, "reason": "no_node"}
         
-        return {"type": "control_failed", "agent": agent_type.value, "reason": "no_node"}
+        was_controlled = node.is_controlled()
+        previous_owner = node.controlled_by
+        
+        if not was_controlled:
+            # Control empty node
+            agent.fuel -= CFG.FUEL_COST_CONTROL_EMPTY
+            node.controlled_by = agent_type
+            agent.nodes_controlled += 1
+            self.unclaimed_nodes = self.unclaimed_nodes - {node.pos}
+            
+            action = {
+                "type": "control_node",
+                "agent": agent_type.value,
+                "position": node.position._asdict(),
+                "fuel_cost": CFG.FUEL_COST_CONTROL_EMPTY,
+                "new_fuel": agent.fuel,
+                "turn": self.turn
+            }
+        elif previous_owner != agent_type:
+            # Capture opponent's node
+            agent.fuel -= CFG.FUEL_COST_CAPTURE
+            
+            # Update previous owner
+            if previous_owner:
+                self.agents[previous_owner].nodes_controlled -= 1
+            
+            node.controlled_by = agent_type
+            agent.nodes_controlled += 1
+            
+            action = {
+                "type": "capture_node",
+                "agent": agent_type.value,
+                "from_agent": previous_owner.value if previous_owner else None,
+                "position": node.position._asdict(),
+                "fuel_cost": CFG.FUEL_COST_CAPTURE,
+                "new_fuel": agent.fuel,
+                "turn": self.turn
+            }
+        else:
+            return {"type": "control_failed", "agent": agent_type.value, "reason": "already_controlled"}
+        
+        if self.record_history:
+            self.action_history.append(action)
+        return action
     
-    def update_fuel_stations(self):
-        """Update fuel station respawn timers"""
+    def next_turn(self):
+        """Advance to next turn"""
+        self.turn += 1
+        self.current_player = OPPONENT[self.current_player]
+        
+        # Fuel station respawn timers
         for station in self.fuel_stations:
             if not station.is_active:
                 station.respawn_counter -= 1
                 if station.respawn_counter <= 0:
                     station.is_active = True
-                    station.fuel_remaining = config.FUEL_STATION_INITIAL
-    
-    def next_turn(self):
-        """Advance to next turn"""
-        self.turn += 1
-        self.current_player = (AgentType.INSTINCT if self.current_player == AgentType.STRATEGIST 
-                              else AgentType.STRATEGIST)
-        
-        # Update fuel stations
-        self.update_fuel_stations()
+                    station.fuel_remaining = CFG.FUEL_STATION_INITIAL
     
     def is_game_over(self) -> bool:
         """Check if game is over"""
@@ -393,20 +523,245 @@ class GameState:
         # Draw
         return None
     
+    def compute_zobrist(self) -> int:
+        """
+        Zobrist hash of everything that affects search: agent positions and
+        fuel, node ownership, station fuel and the side to move. apply_with_undo()
+        and undo_action() keep self.zobrist up to date incrementally; other
+        mutators don't, so search copies recompute it (fast_clone, copy_from).
+        """
+        h = 0
+        for agent_type, agent in self.agents.items():
+            index = AGENT_INDEX[agent_type]
+            h ^= ZOBRIST_POS[index][agent.pos] ^ ZOBRIST_FUEL[index][agent.fuel]
+        for node in self.light_nodes:
+            h ^= ZOBRIST_OWNER[node.pos][AGENT_INDEX.get(node.controlled_by, NO_OWNER) + 1]
+        for station in self.fuel_stations:
+            h ^= ZOBRIST_STATION[station.pos][station.fuel_remaining]
+        if self.current_player == AgentType.INSTINCT:
+            h ^= ZOBRIST_SIDE
+        return h
+    
+    def to_arrays(self) -> Tuple[np.ndarray, ...]:
+        """
+        Copy the state into flat NumPy arrays for compiled kernels:
+        (grid, agent_pos, agent_fuel, agent_nodes, node_owner, node_pos,
+        station_fuel, station_active, station_counter, station_pos,
+        adj_flat, adj_offsets). Agents are indexed by AGENT_ORDER.
+        """
+        agents = [self.agents[agent_type] for agent_type in AGENT_ORDER]
+        stations = self.fuel_stations
+        return (
+            self.grid,
+            np.array([a.pos for a in agents], dtype=np.int32),
+            np.array([a.fuel for a in agents], dtype=np.int32),
+            np.array([a.nodes_controlled for a in agents], dtype=np.int32),
+            np.array([AGENT_INDEX.get(n.controlled_by, NO_OWNER) for n in self.light_nodes],
+                     dtype=np.int8),
+            np.array([n.pos for n in self.light_nodes], dtype=np.int32),
+            np.array([s.fuel_remaining for s in stations], dtype=np.int32),
+            np.array([s.is_active for s in stations], dtype=np.bool_),
+            np.array([s.respawn_counter for s in stations], dtype=np.int32),
+            np.array([s.pos for s in stations], dtype=np.int32),
+            self.adj_flat,
+            self.adj_offsets
+        )
+    
+    def apply_with_undo(self, agent_type: AgentType, action_type: Action,
+                        target: Optional[int]) -> tuple:
+        """
+        Apply an AI search action in place and advance the turn; returns an
+        undo record for undo_action(). Search rules: no history, and a
+        station emptied here does not start its respawn timer.
+        """
+        agent = self.agents[agent_type]
+        prev_pos, prev_fuel = agent.pos, agent.fuel
+        node = prev_owner = station = None
+        prev_station_fuel = 0
+        prev_hash = h = self.zobrist
+        index = AGENT_INDEX[agent_type]
+        
+        if action_type == MOVE:
+            agent.pos = target
+            h ^= ZOBRIST_POS[index][prev_pos] ^ ZOBRIST_POS[index][target]
+        
+        elif action_type == REFUEL:
+            station = self.station_by_pos.get(agent.pos)
+            if station is not None and station.is_active:
+                prev_station_fuel = station.fuel_remaining
+                fuel_gained = min(CFG.FUEL_REFUEL_AMOUNT, 
+                                 CFG.MAX_FUEL - agent.fuel,
+                                 station.fuel_remaining)
+                agent.fuel += fuel_gained
+                station.fuel_remaining -= fuel_gained
+                
+                if station.is_depleted():
+                    station.is_active = False
+                
+                h ^= (ZOBRIST_STATION[station.pos][prev_station_fuel]
+                      ^ ZOBRIST_STATION[station.pos][station.fuel_remaining])
+            else:
+                station = None
+        
+        elif action_type == CONTROL_NODE:
+            node = self.node_by_pos.get(agent.pos)
+            if node is not None:
+                prev_owner = node.controlled_by
+                if prev_owner is None:
+                    agent.fuel -= CFG.FUEL_COST_CONTROL_EMPTY
+                    node.controlled_by = agent_type
+                    agent.nodes_controlled += 1
+                    self.unclaimed_nodes = self.unclaimed_nodes - {node.pos}
+                elif prev_owner != agent_type:
+                    agent.fuel -= CFG.FUEL_COST_CAPTURE
+                    self.agents[prev_owner].nodes_controlled -= 1
+                    node.controlled_by = agent_type
+                    agent.nodes_controlled += 1
+                
+                if node.controlled_by != prev_owner:
+                    h ^= (ZOBRIST_OWNER[node.pos][AGENT_INDEX.get(prev_owner, NO_OWNER) + 1]
+                          ^ ZOBRIST_OWNER[node.pos][index + 1])
+        
+        if agent.fuel != prev_fuel:
+            h ^= ZOBRIST_FUEL[index][prev_fuel] ^ ZOBRIST_FUEL[index][agent.fuel]
+        
+        # Stations whose respawn timers next_turn() is about to touch
+        respawning = [(s, s.respawn_counter, s.fuel_remaining)
+                      for s in self.fuel_stations if not s.is_active]
+        prev_player = self.current_player
+        
+        # Advance turn
+        self.next_turn()
+        
+        h ^= ZOBRIST_SIDE
+        for s, _, fuel in respawning:
+            if s.is_active:
+                h ^= ZOBRIST_STATION[s.pos][fuel] ^ ZOBRIST_STATION[s.pos][s.fuel_remaining]
+        self.zobrist = h
+        
+        return (agent_type, prev_pos, prev_fuel, node, prev_owner,
+                station, prev_station_fuel, respawning, prev_player, prev_hash)
+    
+    def undo_action(self, undo: tuple):
+        """Revert an action applied by apply_with_undo()"""
+        (agent_type, prev_pos, prev_fuel, node, prev_owner,
+         station, prev_station_fuel, respawning, prev_player, prev_hash) = undo
+        
+        self.zobrist = prev_hash
+        self.turn -= 1
+        self.current_player = prev_player
+        for s, counter, fuel in respawning:
+            s.is_active = False
+            s.respawn_counter = counter
+            s.fuel_remaining = fuel
+        
+        agent = self.agents[agent_type]
+        agent.pos = prev_pos
+        agent.fuel = prev_fuel
+        
+        if station is not None:
+            station.fuel_remaining = prev_station_fuel
+            station.is_active = True
+        
+        if node is not None and node.controlled_by != prev_owner:
+            node.controlled_by = prev_owner
+            agent.nodes_controlled -= 1
+            if prev_owner is not None:
+                self.agents[prev_owner].nodes_controlled += 1
+            else:
+                self.unclaimed_nodes = self.unclaimed_nodes | {node.pos}
+    
     def clone(self) -> 'GameState':
-        """Create a deep copy of the game state"""
-        return copy.deepcopy(self)
+        """
+        Independent copy of the game state, built by hand rather than with
+        copy.deepcopy: fast_clone() plus the action history (whose entries
+        are never modified, so they are shared)
+        """
+        new = self.fast_clone()
+        new.record_history = self.record_history
+        new.action_history = deque(self.action_history, maxlen=CFG.ACTION_HISTORY_LENGTH)
+        return new
+    
+    def fast_clone(self) -> 'GameState':
+        """
+        Lightweight copy for AI search. Only mutable scalars are copied;
+        the grid is shared (it never changes once generated) and the
+        action history is not carried over.
+        """
+        new = GameState.__new__(GameState)
+        new.grid_size = self.grid_size
+        new.turn = self.turn
+        new.max_turns = self.max_turns
+        new.current_player = self.current_player
+        new.grid = self.grid  # Shared, the grid never changes once generated
+        new.adj = self.adj
+        new.adj_flat = self.adj_flat
+        new.adj_offsets = self.adj_offsets
+        new.agents = {k: Agent(k, a.pos, a.fuel, a.nodes_controlled, a.score)
+                      for k, a in self.agents.items()}
+        new.fuel_stations = [FuelStation(s.pos, s.fuel_remaining, s.is_active, s.respawn_counter)
+                             for s in self.fuel_stations]
+        new.light_nodes = [LightNode(n.pos, n.controlled_by) for n in self.light_nodes]
+        new.doors_open = set(self.doors_open)
+        new.station_by_pos = {s.pos: s for s in new.fuel_stations}
+        new.node_by_pos = {n.pos: n for n in new.light_nodes}
+        new.unclaimed_nodes = self.unclaimed_nodes
+        new.record_history = False
+        new.action_history = deque(maxlen=CFG.ACTION_HISTORY_LENGTH)
+        new.zobrist = self.compute_zobrist()
+        return new
+    
+    def copy_from(self, other: 'GameState'):
+        """
+        Overwrite this search copy with the state of `other` in place, so
+        a state made by fast_clone() can be reused without reallocating
+        its agents, stations and nodes. Objects are only rebuilt when
+        `other` belongs to a different map.
+        """
+        self.turn = other.turn
+        self.current_player = other.current_player
+        for agent_type, agent in other.agents.items():
+            mine = self.agents[agent_type]
+            mine.pos = agent.pos
+            mine.fuel = agent.fuel
+            mine.nodes_controlled = agent.nodes_controlled
+            mine.score = agent.score
+        self.doors_open.clear()
+        self.doors_open.update(other.doors_open)
+        
+        if self.grid is not other.grid:
+            self.grid_size = other.grid_size
+            self.max_turns = other.max_turns
+            self.grid = other.grid
+            self.adj = other.adj
+            self.adj_flat = other.adj_flat
+            self.adj_offsets = other.adj_offsets
+            self.clear_runs = self.los_cache = None
+            self.fuel_stations = [FuelStation(s.pos, s.fuel_remaining, s.is_active, s.respawn_counter)
+                                  for s in other.fuel_stations]
+            self.light_nodes = [LightNode(n.pos, n.controlled_by) for n in other.light_nodes]
+            self.station_by_pos = {s.pos: s for s in self.fuel_stations}
+            self.node_by_pos = {n.pos: n for n in self.light_nodes}
+        else:
+            for mine, station in zip(self.fuel_stations, other.fuel_stations):
+                mine.fuel_remaining = station.fuel_remaining
+                mine.is_active = station.is_active
+                mine.respawn_counter = station.respawn_counter
+            for mine, node in zip(self.light_nodes, other.light_nodes):
+                mine.controlled_by = node.controlled_by
+        self.unclaimed_nodes = other.unclaimed_nodes
+        self.zobrist = self.compute_zobrist()
     
-    def to_dict(self) -> Dict:
+    def to_dict(self, include_grid: bool = True) -> Dict:
         """Convert game state to dictionary for JSON serialization"""
-        return {
+        data = {
             "turn": self.turn,
             "max_turns": self.max_turns,
             "current_player": self.current_player.value,
             "grid_size": self.grid_size,
             "agents": {
                 agent_type.value: {
-                    "position": {"x": agent.position.x, "y": agent.position.y},
+                    "position": agent.position._asdict(),
                     "fuel": agent.fuel,
                     "nodes_controlled": agent.nodes_controlled,
                     "score": agent.score
@@ -415,7 +770,7 @@ class GameState:
             },
             "fuel_stations": [
                 {
-                    "position": {"x": fs.position.x, "y": fs.position.y},
+                    "position": fs.position._asdict(),
                     "fuel_remaining": fs.fuel_remaining,
                     "is_active": fs.is_active
                 }
@@ -423,12 +778,63 @@ class GameState:
             ],
             "light_nodes": [
                 {
-                    "position": {"x": ln.position.x, "y": ln.position.y},
+                    "position": ln.position._asdict(),
                     "controlled_by": ln.controlled_by.value if ln.controlled_by else None
                 }
                 for ln in self.light_nodes
             ],
-            "grid": [[cell.value for cell in row] for row in self.grid],
-            "doors_open": [{"x": pos.x, "y": pos.y} for pos in self.doors_open],
+            "doors_open": [Position.from_key(key)._asdict() for key in self.doors_open],
             "is_game_over": self.is_game_over()
         }
+        
+        # The grid never changes after generation, so per-turn payloads skip it
+        if include_grid:
+            data["grid"] = [[CELL_NAMES[cell] for cell in row] for row in self.grid.tolist()]
+        
+        return data
+    
+    def serialize_delta(self, prev_snapshot: Dict) -> Dict:
+        """
+        Return only the fields that changed since `prev_snapshot` (a
+        to_dict(include_grid=False) result). The snapshot is updated in
+        place so the caller can keep passing the same dict every turn.
+        """
+        current = self.to_dict(include_grid=False)
+        delta = {}
+        
+        for key in ("turn", "current_player", "is_game_over"):
+            if current[key] != prev_snapshot.get(key):
+                delta[key] = current[key]
+        
+        prev_agents = prev_snapshot.get("agents", {})
+        agents = {}
+        for name, fields in current["agents"].items():
+            old = prev_agents.get(name, {})
+            changed = {key: value for key, value in fields.items() if old.get(key) != value}
+            if changed:
+                agents[name] = changed
+        if agents:
+            delta["agents"] = agents
+        
+        prev_stations = prev_snapshot.get("fuel_stations", [])
+        stations = []
+        for index, fields in enumerate(current["fuel_stations"]):
+            old = prev_stations[index] if index < len(prev_stations) else {}
+            changed = {key: value for key, value in fields.items() if old.get(key) != value}
+            if changed:
+                stations.append([index, changed])
+        if stations:
+            delta["fuel_stations"] = stations
+        
+        prev_nodes = prev_snapshot.get("light_nodes", [])
+        nodes = [
+            [index, node["controlled_by"]]
+            for index, node in enumerate(current["light_nodes"])
+            if index >= len(prev_nodes) or prev_nodes[index]["controlled_by"] != node["controlled_by"]
+        ]
+        if nodes:
+            delta["light_nodes"] = nodes
+        
+        prev_snapshot.clear()
+        prev_snapshot.update(current)
+        return delta
@@ -1,18 +1,18 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 import asyncio
-import json
+import orjson
 from typing import Dict, Optional
 import os
 
-from game_state import GameState, AgentType, Position
+from game_state import GameState, AgentType, Action
 from minimax_ai import MinimaxAI
 from mcts_ai import MCTSAI
 from scoring import update_agent_score, calculate_final_scores
-import config
+from config import CFG
 
-app = FastAPI(title="Fuel Dominion")
+app = FastAPI(title="Fuel Dominion", default_response_class=ORJSONResponse)
 
 # Game state
 game: Optional[GameState] = None
@@ -24,6 +24,10 @@ active_websocket: Optional[WebSocket] = None
 frontend_path = os.path.join(os.path.dirname(__file__), "..", "frontend")
 app.mount("/static", StaticFiles(directory=frontend_path), name="static")
 
+async def send_message(websocket: WebSocket, message: Dict):
+    """Send a message as orjson-encoded bytes (faster than stdlib json)"""
+    await websocket.send_bytes(orjson.dumps(message))
+
 @app.get("/")
 async def root():
     """Serve the main HTML file"""
@@ -34,7 +38,7 @@ async def start_game():
     """Initialize a new game"""
     global game, minimax_ai, mcts_ai
     
-    game = GameState()
+    game = GameState(seed=CFG.MAP_SEED)
     minimax_ai = MinimaxAI(AgentType.STRATEGIST)
     mcts_ai = MCTSAI(AgentType.INSTINCT)
     
@@ -65,7 +69,7 @@ async def websocket_endpoint(websocket: WebSocket):
             await start_game()
         
         # Send initial game state
-        await websocket.send_json({
+        await send_message(websocket, {
             "type": "state_update",
             "data": game.to_dict()
         })
@@ -78,7 +82,7 @@ async def websocket_endpoint(websocket: WebSocket):
                 await start_game_loop(websocket)
             elif data.get("command") == "reset":
                 await start_game()
-                await websocket.send_json({
+                await send_message(websocket, {
                     "type": "state_update",
                     "data": game.to_dict()
                 })
@@ -92,36 +96,58 @@ async def start_game_loop(websocket: WebSocket):
     global game, minimax_ai, mcts_ai
     
     # Always reset game state when starting
-    game = GameState()
+    game = GameState(seed=CFG.MAP_SEED)
     minimax_ai = MinimaxAI(AgentType.STRATEGIST)
     mcts_ai = MCTSAI(AgentType.INSTINCT)
     
     # Send game start notification
-    await websocket.send_json({
+    await send_message(websocket, {
         "type": "game_start",
         "data": game.to_dict()
     })
     
+    # Per-turn updates only carry what changed since this snapshot
+    prev_snapshot = game.to_dict(include_grid=False)
+    
     # Small initial delay before starting
     await asyncio.sleep(0.5)
     
+    # AI turns are produced ahead of the viewer; the sender paces them out
+    queue: asyncio.Queue = asyncio.Queue(maxsize=8)
+    producer = asyncio.create_task(play_turns(queue, prev_snapshot, game, minimax_ai, mcts_ai))
+    consumer = asyncio.create_task(send_turns(websocket, queue))
+    
+    try:
+        await asyncio.gather(producer, consumer)
+    finally:
+        producer.cancel()
+        consumer.cancel()
+
+async def play_turns(queue: asyncio.Queue, prev_snapshot: Dict, game_state: GameState,
+                     minimax_ai: MinimaxAI, mcts_ai: MCTSAI):
+    """Producer: run AI turns back to back and queue the resulting messages"""
     # Game loop
-    while not game.is_game_over():
-        current_agent = game.current_player
+    while not game_state.is_game_over():
+        # Stop if a new game was started (e.g. /api/start) while the AI was thinking
+        if game_state is not game:
+            await queue.put(None)
+            return
+        
+        current_agent = game_state.current_player
         
         # Update scores
-        update_agent_score(game, current_agent)
+        update_agent_score(game_state, current_agent)
         
-        # Get AI decision
+        # Get AI decision (in a worker thread so the event loop stays responsive)
         if current_agent == AgentType.STRATEGIST:
-            action_type, target = minimax_ai.get_best_action(game)
+            action_type, target = await asyncio.to_thread(minimax_ai.get_best_action, game_state)
             ai_name = "Unit S (Strategist)"
             ai_info = {
                 "algorithm": "Minimax",
                 "nodes_explored": minimax_ai.nodes_explored
             }
         else:
-            action_type, target = mcts_ai.get_best_action(game)
+            action_type, target = await asyncio.to_thread(mcts_ai.get_best_action, game_state)
             ai_name = "Unit I (Instinct)"
             ai_info = {
                 "algorithm": "MCTS",
@@ -131,50 +157,62 @@ async def start_game_loop(websocket: WebSocket):
         # Execute action
         action_result = None
         
-        if action_type == "move" and target:
-            action_result = game.execute_move(current_agent, target)
-        elif action_type == "refuel":
-            action_result = game.execute_refuel(current_agent)
-        elif action_type == "control_node":
-            action_result = game.execute_control_node(current_agent)
-        elif action_type == "wait":
+        if action_type == Action.MOVE and target is not None:
+            action_result = game_state.execute_move(current_agent, target)
+        elif action_type == Action.REFUEL:
+            action_result = game_state.execute_refuel(current_agent)
+        elif action_type == Action.CONTROL_NODE:
+            action_result = game_state.execute_control_node(current_agent)
+        elif action_type == Action.WAIT:
             action_result = {
                 "type": "wait",
                 "agent": current_agent.value,
-                "turn": game.turn
+                "turn": game_state.turn
             }
         
         # Advance turn
-        game.next_turn()
+        game_state.next_turn()
         
-        # Send update to frontend
+        # Queue update for the frontend
         if action_result:
-            await websocket.send_json({
+            await queue.put({
                 "type": "action",
                 "data": {
                     "action": action_result,
                     "ai_info": ai_info,
                     "ai_name": ai_name,
-                    "state": game.to_dict()
+                    "changes": game_state.serialize_delta(prev_snapshot)
                 }
             })
         
-        # Wait before next turn (configurable delay for visibility)
-        await asyncio.sleep(config.TURN_DELAY)
     
     # Game over - calculate final scores
-    calculate_final_scores(game)
-    winner = game.get_winner()
+    calculate_final_scores(game_state)
+    winner = game_state.get_winner()
     
-    await websocket.send_json({
+    await queue.put({
         "type": "game_over",
         "data": {
             "winner": winner.value if winner else "draw",
-            "final_state": game.to_dict(),
-            "strategist_score": game.agents[AgentType.STRATEGIST].score,
-            "instinct_score": game.agents[AgentType.INSTINCT].score
+            "final_state": game_state.to_dict(include_grid=False),
+            "strategist_score": game_state.agents[AgentType.STRATEGIST].score,
+            "instinct_score": game_state.agents[AgentType.INSTINCT].score
         }
     })
+    await queue.put(None)
+
+async def send_turns(websocket: WebSocket, queue: asyncio.Queue):
+    """Consumer: send queued messages, pausing between turns for visibility"""
+    while True:
+        message = await queue.get()
+        if message is None:
+            break
+        
+        await send_message(websocket, message)
+        
+        # Wait before next turn (configurable delay for visibility)
+        if message["type"] == "action":
+            await asyncio.sleep(CFG.TURN_DELAY)
 
 @app.get("/api/stats")
 async def get_stats():
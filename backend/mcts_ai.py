@@ -1,63 +1,280 @@
 import math
+import os
+import pickle
 import random
-import copy
-from typing import List, Tuple, Optional
-from game_state import GameState, AgentType, Position, CellType
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Tuple, Optional
+import numpy as np
+from game_state import (GameState, AgentType, Action, MOVE, REFUEL, CONTROL_NODE,
+                        WAIT, AGENT_INDEX, OPPONENT, DIST, nearest_distances)
 from scoring import evaluate_state
-import config
+from scoring_numba import NUMBA_AVAILABLE, njit, SCORE_WEIGHTS, evaluate_arrays, evaluate_arrays_batch
+from config import CFG
+
+@njit(cache=True)
+def _seed_rollouts(seed):
+    """Seed the RNG used inside compiled rollouts"""
+    np.random.seed(seed)
+
+@njit(cache=True, nogil=True)
+def mcts_rollout(agent_pos, agent_fuel, agent_nodes, node_owner, node_pos,
+                 station_fuel, station_active, station_counter, station_pos,
+                 adj_flat, adj_offsets, starting_agent, turn, max_turns, depth, rules):
+    """
+    Random playout on the flat arrays of GameState.to_arrays(), mirroring
+    MCTSAI._get_quick_actions and MCTSAI._apply_action. The arrays are
+    updated in place; returns the turn reached. Like MCTSAI._rollout_python,
+    stops early once a side leads by the decisive number of nodes.
+    
+    rules = [MAX_FUEL, FUEL_REFUEL_AMOUNT, FUEL_COST_CONTROL_EMPTY,
+             FUEL_COST_CAPTURE, FUEL_STATION_INITIAL, MCTS_DECISIVE_LEAD]
+    """
+    max_fuel, refuel_amount, cost_empty, cost_capture, station_initial, decisive_lead = (
+        rules[0], rules[1], rules[2], rules[3], rules[4], rules[5])
+    
+    # Position -> node/station index lookups
+    node_at = np.full(adj_offsets.shape[0] - 1, -1, np.int32)
+    for i in range(node_pos.shape[0]):
+        node_at[node_pos[i]] = i
+    station_at = np.full(adj_offsets.shape[0] - 1, -1, np.int32)
+    for i in range(station_pos.shape[0]):
+        station_at[station_pos[i]] = i
+    
+    current = starting_agent
+    for ply in range(depth):
+        if turn >= max_turns:
+            break
+        if decisive_lead > 0 and ply % 2 == 0 and abs(agent_nodes[0] - agent_nodes[1]) >= decisive_lead:
+            break
+        
+        pos = agent_pos[current]
+        fuel = agent_fuel[current]
+        
+        # Quick actions: [control_node], [refuel], moves...
+        node = node_at[pos]
+        can_control = False
+        if node >= 0:
+            owner = node_owner[node]
+            if owner < 0 and fuel >= cost_empty:
+                can_control = True
+            elif owner != current and fuel >= cost_capture:
+                can_control = True
+        
+        station = station_at[pos]
+        can_refuel = (station >= 0 and station_active[station] and station_fuel[station] > 0
+                      and fuel * 2 < max_fuel)
+        
+        move_start = adj_offsets[pos]
+        num_moves = adj_offsets[pos + 1] - move_start
+        num_actions = num_moves + int(can_control) + int(can_refuel)
+        if num_actions == 0:
+            break
+        
+        choice = np.random.randint(0, num_actions)
+        if can_control:
+            if choice == 0:
+                owner = node_owner[node]
+                if owner < 0:
+                    agent_fuel[current] -= cost_empty
+                    node_owner[node] = current
+                    agent_nodes[current] += 1
+                elif owner != current:
+                    agent_fuel[current] -= cost_capture
+                    agent_nodes[owner] -= 1
+                    node_owner[node] = current
+                    agent_nodes[current] += 1
+                choice = -1
+            else:
+                choice -= 1
+        if can_refuel and choice >= 0:
+            if choice == 0:
+                gained = min(refuel_amount, max_fuel - fuel, station_fuel[station])
+                agent_fuel[current] += gained
+                station_fuel[station] -= gained
+                if station_fuel[station] <= 0:
+                    station_active[station] = False
+                choice = -1
+            else:
+                choice -= 1
+        if choice >= 0:
+            agent_pos[current] = adj_flat[move_start + choice]
+        
+        # next_turn(): advance and respawn depleted stations
+        turn += 1
+        for i in range(station_active.shape[0]):
+            if not station_active[i]:
+                station_counter[i] -= 1
+                if station_counter[i] <= 0:
+                    station_active[i] = True
+                    station_fuel[i] = station_initial
+        
+        current = 1 - current
+    
+    return turn
+
+@njit(cache=True, nogil=True)
+def mcts_rollout_batch(agent_pos, agent_fuel, agent_nodes, node_owner, node_pos,
+                       station_fuel, station_active, station_counter, station_pos,
+                       adj_flat, adj_offsets, starting_agent, turns, max_turns, depth, rules):
+    """
+    mcts_rollout over a batch of states from the same map: every array but
+    node_pos, station_pos and the adjacency has a leading [batch] axis, as
+    does `turns`. Returns the turn reached by each row.
+    """
+    reached = np.empty(agent_pos.shape[0], np.int32)
+    for b in range(agent_pos.shape[0]):
+        reached[b] = mcts_rollout(agent_pos[b], agent_fuel[b], agent_nodes[b], node_owner[b], node_pos,
+                                  station_fuel[b], station_active[b], station_counter[b], station_pos,
+                                  adj_flat, adj_offsets, starting_agent, turns[b], max_turns, depth, rules)
+    return reached
+
+# Scratch states for rollouts, reused across simulations instead of cloning
+# the leaf state each time. AI threads share it: list.pop/append are atomic,
+# and an empty pool is detected by pop() itself rather than checked first
+_STATE_POOL: List[GameState] = []
+
+def _acquire_state(state: GameState) -> GameState:
+    """Take a scratch copy of `state` from the pool"""
+    try:
+        sim_state = _STATE_POOL.pop()
+    except IndexError:
+        return state.fast_clone()
+    sim_state.copy_from(state)
+    return sim_state
+
+def _release_state(sim_state: GameState):
+    """Return a scratch state to the pool"""
+    _STATE_POOL.append(sim_state)
+
+# Tree nodes of finished searches, reinitialized by expand() instead of
+# allocating a new node per expansion
+_NODE_POOL: List['MCTSNode'] = []
+
+def _acquire_node(state: GameState, agent_type: AgentType,
+                  parent=None, action=None) -> 'MCTSNode':
+    """Take a node from the pool, set up for `state`"""
+    try:
+        node = _NODE_POOL.pop()
+    except IndexError:
+        return MCTSNode(state, agent_type, parent, action)
+    node.reset(state, agent_type, parent, action)
+    return node
+
+def _release_tree(root: 'MCTSNode'):
+    """Return every node of a finished search tree to the pool"""
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        stack.extend(node.children)
+        node.children.clear()
+        node.parent = None
+        _NODE_POOL.append(node)
+
+# Persistent worker processes for root-parallel search (created on first use)
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    global _executor, _executor_workers
+    if _executor is None or _executor_workers != workers:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = ProcessPoolExecutor(max_workers=workers)
+        _executor_workers = workers
+    return _executor
+
+def _root_worker(state_bytes: bytes, agent_type: AgentType, seed: int,
+                 simulations: int) -> Dict[Tuple[Action, Optional[int]], Tuple[float, int]]:
+    """Grow an independent tree in a worker process; returns its root (wins, visits)"""
+    random.seed(seed)
+    ai = MCTSAI(agent_type)
+    root = ai.search(pickle.loads(state_bytes), simulations)
+    stats = {child.action: (child.wins, child.visits) for child in root.children}
+    _release_tree(root)
+    return stats
+
+def _root_win_rate(wins: float, visits: int) -> float:
+    """
+    Smoothed win rate (w+1)/(n+2) of a root move for the searching agent.
+    Root children hold results from the opponent's side (the side to move
+    there), so the agent's share is visits - wins. The prior keeps a move
+    with a lucky visit or two from beating a well-explored one.
+    """
+    return (visits - wins + 1.0) / (visits + 2.0)
 
 class MCTSNode:
-    """Node in the Monte Carlo Tree Search"""
+    """
+    Node in the Monte Carlo Tree Search. Nodes don't keep a state: the
+    search moves one working state down the tree and back (make/unmake),
+    and `state` is only read here to set up the node.
+    """
+    
+    __slots__ = ('agent_type', 'parent', 'action', 'children', 'wins', 'visits',
+                 'virtual_loss', 'terminal', 'untried_actions', 'zobrist')
     
     def __init__(self, state: GameState, agent_type: AgentType, 
                  parent=None, action=None):
-        self.state = state
+        self.children: List['MCTSNode'] = []
+        self.reset(state, agent_type, parent, action)
+    
+    def reset(self, state: GameState, agent_type: AgentType, parent=None, action=None):
+        """(Re)initialize the node for `state`; `children` must already be empty"""
         self.agent_type = agent_type
         self.parent = parent
         self.action = action  # (action_type, target)
         
-        self.children: List['MCTSNode'] = []
         self.wins = 0.0
         self.visits = 0
-        self.untried_actions = self._get_possible_actions()
+        self.virtual_loss = 0  # Simulations in flight below this node (threaded search)
+        self.zobrist = state.zobrist  # Identifies the node when the tree is reused next turn
+        self.terminal = state.is_game_over()
+        self.untried_actions = self._get_possible_actions(state)
     
-    def _get_possible_actions(self) -> List[Tuple[str, Optional[Position]]]:
+    def _get_possible_actions(self, state: GameState) -> List[Tuple[Action, Optional[int]]]:
         """Get all possible actions from this state, prioritized for smart expansion"""
         actions = []
-        agent = self.state.agents[self.agent_type]
-        opponent_type = (AgentType.INSTINCT if self.agent_type == AgentType.STRATEGIST 
-                        else AgentType.STRATEGIST)
+        agent = state.agents[self.agent_type]
+        opponent_type = OPPONENT[self.agent_type]
         
         # PRIORITY 1: Control/Capture node - this wins the game!
-        node = self.state.can_control_node(self.agent_type)
+        node = state.can_control_node(self.agent_type)
         if node:
-            actions.append(("control_node", None))
+            actions.append((CONTROL_NODE, None))
         
         # PRIORITY 2: Refuel when needed
-        if self.state.can_refuel(self.agent_type) and agent.fuel < config.MAX_FUEL:
-            actions.append(("refuel", None))
+        if state.can_refuel(self.agent_type) and agent.fuel < CFG.MAX_FUEL:
+            actions.append((REFUEL, None))
         
         # PRIORITY 3: Moves - sorted by strategic value
-        possible_moves = self.state.get_possible_moves(self.agent_type)
+        possible_moves = state.get_possible_moves(self.agent_type)
         
         # Score each move for prioritization
+        control_cost = CFG.FUEL_COST_CONTROL_EMPTY
+        capture_cost = CFG.FUEL_COST_CAPTURE
+        
+        # Distance to the nearest unclaimed node, the same for every move
+        unclaimed = state.unclaimed_nodes
+        unclaimed_dist = nearest_distances(unclaimed) if unclaimed else None
+        
         scored_moves = []
         for move_pos in possible_moves:
             score = 0
             
             # Moves onto light nodes are highest priority
-            for ln in self.state.light_nodes:
-                if ln.position.x == move_pos.x and ln.position.y == move_pos.y:
-                    if not ln.is_controlled() and agent.fuel >= config.FUEL_COST_CONTROL_EMPTY:
-                        score += 100
-                    elif ln.controlled_by == opponent_type and agent.fuel >= config.FUEL_COST_CAPTURE:
-                        score += 80
+            ln = state.node_by_pos.get(move_pos)
+            if ln is not None:
+                if not ln.is_controlled() and agent.fuel >= control_cost:
+                    score += 100
+                elif ln.controlled_by == opponent_type and agent.fuel >= capture_cost:
+                    score += 80
             
             # Closer to unclaimed nodes is better
-            unclaimed = [n for n in self.state.light_nodes if not n.is_controlled()]
-            if unclaimed:
-                min_dist = min(move_pos.distance_to(n.position) for n in unclaimed)
-                score += max(0, 20 - min_dist)
+            if unclaimed_dist is not None:
+                bonus = 20 - unclaimed_dist[move_pos]
+                if bonus > 0:
+                    score += bonus
             
             scored_moves.append((score, move_pos))
         
@@ -65,7 +282,7 @@ class MCTSNode:
         scored_moves.sort(key=lambda x: x[0], reverse=True)
         
         for _, move_pos in scored_moves:
-            actions.append(("move", move_pos))
+            actions.append((MOVE, move_pos))
         
         return actions
     
@@ -75,22 +292,26 @@ class MCTSNode:
     
     def is_terminal(self) -> bool:
         """Check if this is a terminal state"""
-        return self.state.is_game_over()
+        return self.terminal
     
-    def best_child(self, exploration_weight: float = config.MCTS_EXPLORATION) -> 'MCTSNode':
+    def best_child(self, exploration_weight: float = CFG.MCTS_EXPLORATION) -> 'MCTSNode':
         """Select best child using UCB1 formula"""
         best_score = float('-inf')
         best_child = None
         
+        # ln(N) of the parent is the same for every child
+        parent_visits = self.visits + self.virtual_loss
+        log_parent = math.log(parent_visits) if parent_visits > 0 else 0.0
+        sqrt = math.sqrt
+        
+        # In-flight simulations count as lost visits, steering other threads
+        # towards siblings until they report back
         for child in self.children:
-            if child.visits == 0:
-                ucb_score = float('inf')
-            else:
-                exploitation = child.wins / child.visits
-                exploration = exploration_weight * math.sqrt(
-                    math.log(self.visits) / child.visits
-                )
-                ucb_score = exploitation + exploration
+            visits = child.visits + child.virtual_loss
+            if visits == 0:
+                return child  # Unvisited children score +inf, the first one wins
+            
+            ucb_score = child.wins / visits + exploration_weight * sqrt(log_parent / visits)
             
             if ucb_score > best_score:
                 best_score = ucb_score
@@ -98,21 +319,22 @@ class MCTSNode:
         
         return best_child
     
-    def expand(self) -> 'MCTSNode':
-        """Expand tree by trying an untried action"""
+    def expand(self, state: GameState) -> Tuple['MCTSNode', tuple]:
+        """
+        Expand tree by trying an untried action. `state` is at this node and
+        is moved to the new child; returns the child and the undo record.
+        """
         action = self.untried_actions.pop()
         
-        # Apply action to create new state
-        next_state = self.state.clone()
-        MCTSAI._apply_action(next_state, self.agent_type, action[0], action[1])
+        # Apply action in place
+        undo = state.apply_with_undo(self.agent_type, action[0], action[1])
         
         # Create child node (with opponent's turn)
-        opponent_type = (AgentType.INSTINCT if self.agent_type == AgentType.STRATEGIST 
-                        else AgentType.STRATEGIST)
-        child_node = MCTSNode(next_state, opponent_type, parent=self, action=action)
+        opponent_type = OPPONENT[self.agent_type]
+        child_node = _acquire_node(state, opponent_type, parent=self, action=action)
         
         self.children.append(child_node)
-        return child_node
+        return child_node, undo
     
     def update(self, result: float):
         """Backpropagate result"""
@@ -127,66 +349,326 @@ class MCTSAI:
     
     def __init__(self, agent_type: AgentType):
         self.agent_type = agent_type
-        self.opponent_type = (AgentType.INSTINCT if agent_type == AgentType.STRATEGIST 
-                             else AgentType.STRATEGIST)
+        self.opponent_type = OPPONENT[agent_type]
         self.simulations_run = 0
+        
+        if NUMBA_AVAILABLE:
+            # Compiled rollouts have their own RNG; derive it from `random`
+            _seed_rollouts(random.getrandbits(32))
+            self._rules = np.array([
+                CFG.MAX_FUEL, CFG.FUEL_REFUEL_AMOUNT, CFG.FUEL_COST_CONTROL_EMPTY,
+                CFG.FUEL_COST_CAPTURE, CFG.FUEL_STATION_INITIAL, CFG.MCTS_DECISIVE_LEAD
+            ], dtype=np.int32)
+        
+        # Own RNG for Python rollouts and worker seeds (seeded from `random`,
+        # so games stay reproducible under random.seed)
+        self.rng = random.Random(random.getrandbits(64))
+        
+        # Subtree below our last move, kept for the next get_best_action call,
+        # and the turn it was reached at
+        self._last_root: Optional[MCTSNode] = None
+        self._last_turn = -1
     
-    def get_best_action(self, state: GameState) -> Tuple[str, Optional[Position]]:
+    def get_best_action(self, state: GameState) -> Tuple[Action, Optional[int]]:
         """
         Determine the best action using Monte Carlo Tree Search
-        Returns: (action_type, target_position)
+        Returns: (action_type, target_pkey)
+        """
+        workers = CFG.MCTS_WORKERS or os.cpu_count() or 1
+        if workers > 1:
+            return self._parallel_best_action(state, workers)
+        
+        root = self.search(state, CFG.MCTS_SIMULATIONS, self._reuse_root(state))
+        
+        # Choose best action
+        if not root.children:
+            # No valid actions
+            _release_tree(root)
+            return (WAIT, None)
+        
+        best_child = max(root.children, key=lambda c: _root_win_rate(c.wins, c.visits))
+        
+        # Keep the subtree of the chosen move; the opponent's reply is one of its children
+        root.children.remove(best_child)
+        best_child.parent = None
+        _release_tree(root)
+        self._last_root = best_child
+        self._last_turn = state.turn + 1
+        return best_child.action
+    
+    def _reuse_root(self, state: GameState) -> Optional[MCTSNode]:
+        """
+        Find `state` among the opponent's replies below our last move and
+        detach it as the new root, so its statistics carry over. Returns
+        None (and drops the old tree) when it isn't there.
+        """
+        last_root, self._last_root = self._last_root, None
+        if last_root is None:
+            return None
+        
+        root = None
+        if state.turn == self._last_turn + 1:
+            zobrist = state.compute_zobrist()
+            for child in last_root.children:
+                if child.zobrist == zobrist:
+                    root = child
+                    break
+        
+        if root is not None:
+            last_root.children.remove(root)
+            root.parent = None
+        _release_tree(last_root)
+        return root
+    
+    def _parallel_best_action(self, state: GameState, workers: int) -> Tuple[Action, Optional[int]]:
+        """
+        Root parallelization: each worker process grows its own tree over a
+        share of the simulations, and root wins and visits are summed
+        """
+        state_bytes = pickle.dumps(state.fast_clone())
+        shares = [CFG.MCTS_SIMULATIONS // workers + (i < CFG.MCTS_SIMULATIONS % workers)
+                  for i in range(workers)]
+        
+        executor = _get_executor(workers)
+        futures = [executor.submit(_root_worker, state_bytes, self.agent_type,
+                                   self.rng.getrandbits(32), share)
+                   for share in shares if share > 0]
+        
+        wins, visits = Counter(), Counter()
+        for future in futures:
+            for action, (action_wins, action_visits) in future.result().items():
+                wins[action] += action_wins
+                visits[action] += action_visits
+        self.simulations_run = sum(shares)
+        
+        if not visits:
+            return (WAIT, None)
+        return max(visits, key=lambda action: _root_win_rate(wins[action], visits[action]))
+    
+    def search(self, state: GameState, simulations: int,
+               root: Optional[MCTSNode] = None) -> MCTSNode:
+        """
+        Run the given number of MCTS iterations from `state`, growing `root`
+        (a tree reused from an earlier search) if given; returns the root
         """
         self.simulations_run = 0
         
+        # Working copy, moved down the tree and back for every iteration
+        state = state.fast_clone()
+        
         # Create root node
-        root = MCTSNode(state, self.agent_type)
+        if root is None:
+            root = _acquire_node(state, self.agent_type)
+        
+        if CFG.MCTS_BATCH and NUMBA_AVAILABLE and root.untried_actions and not root.is_terminal():
+            # The first iterations would expand and simulate each root child in
+            # turn anyway; do them up front with a single batched rollout
+            children, leaf_states = [], []
+            for _ in range(len(root.untried_actions)):
+                child, undo = root.expand(state)
+                children.append(child)
+                leaf_states.append(_acquire_state(state))
+                state.undo_action(undo)
+            results = self._simulate_batch(leaf_states, self.agent_type)
+            for child, result, leaf_state in zip(children, results, leaf_states):
+                self._backpropagate(child, result)
+                _release_state(leaf_state)
+            self.simulations_run = len(children)
+        
+        remaining = simulations - self.simulations_run
+        if CFG.MCTS_THREADS > 1 and remaining > 0:
+            self._search_threaded(root, state, remaining, CFG.MCTS_THREADS)
+            return root
+        if CFG.MCTS_LEAF_BATCH > 1 and remaining > 0:
+            self._search_leaf_batched(root, state, remaining, CFG.MCTS_LEAF_BATCH)
+            return root
         
         # Run MCTS simulations
-        for _ in range(config.MCTS_SIMULATIONS):
+        path = []
+        for _ in range(remaining):
             self.simulations_run += 1
             
-            # Selection
-            node = self._select(root)
-            
-            # Expansion
-            if not node.is_terminal() and not node.is_fully_expanded():
-                node = node.expand()
+            # Selection and expansion
+            node = self._descend(root, state, path)
             
             # Simulation
-            result = self._simulate(node.state, self.agent_type)
+            result = self._simulate(state, self.agent_type)
             
             # Backpropagation
             self._backpropagate(node, result)
+            self._rewind(state, path)
         
-        # Choose best action
-        if not root.children:
-            # No valid actions
-            return ("wait", None)
+        return root
+    
+    def _search_threaded(self, root: MCTSNode, root_state: GameState, simulations: int,
+                         threads: int):
+        """
+        Tree parallelization: threads share one tree, with virtual loss on the
+        path of each simulation in flight. Tree updates take a lock; the
+        rollouts themselves run in parallel when compiled (nogil kernel).
+        """
+        lock = threading.Lock()
         
-        best_child = max(root.children, key=lambda c: c.visits)
-        return best_child.action
+        def worker(count: int):
+            state = root_state.fast_clone()  # Each thread walks its own working copy
+            path = []
+            for _ in range(count):
+                with lock:
+                    node = self._descend(root, state, path)
+                    self._add_virtual_loss(node, 1)
+                
+                result = self._simulate(state, self.agent_type)
+                
+                with lock:
+                    self._add_virtual_loss(node, -1)
+                    self._backpropagate(node, result)
+                self._rewind(state, path)
+        
+        shares = [simulations // threads + (i < simulations % threads) for i in range(threads)]
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            for future in [executor.submit(worker, share) for share in shares]:
+                future.result()
+        self.simulations_run += simulations
+    
+    def _search_leaf_batched(self, root: MCTSNode, state: GameState, simulations: int,
+                             batch_size: int):
+        """
+        Leaf parallelization: select up to `batch_size` leaves (with virtual
+        loss so they differ), play them all out in one batched rollout, then
+        backpropagate each result
+        """
+        path = []
+        done = 0
+        while done < simulations:
+            leaves, leaf_states = [], []
+            for _ in range(min(batch_size, simulations - done)):
+                node = self._descend(root, state, path)
+                self._add_virtual_loss(node, 1)
+                leaves.append(node)
+                leaf_states.append(_acquire_state(state))
+                self._rewind(state, path)
+            
+            results = self._simulate_batch(leaf_states, self.agent_type)
+            for leaf, result, leaf_state in zip(leaves, results, leaf_states):
+                self._add_virtual_loss(leaf, -1)
+                self._backpropagate(leaf, result)
+                _release_state(leaf_state)
+            done += len(leaves)
+        self.simulations_run += simulations
+    
+    @staticmethod
+    def _add_virtual_loss(node: MCTSNode, amount: int):
+        """Add (or with a negative amount, remove) virtual loss along a path"""
+        while node is not None:
+            node.virtual_loss += amount
+            node = node.parent
     
-    def _select(self, node: MCTSNode) -> MCTSNode:
-        """Selection phase: traverse tree using UCB1"""
+    def _descend(self, root: MCTSNode, state: GameState, path: List[tuple]) -> MCTSNode:
+        """
+        Selection and expansion: traverse the tree using UCB1 and expand the
+        first node with untried actions. `state` starts at the root and is
+        moved along; the undo records are appended to `path`.
+        """
+        node = root
         while not node.is_terminal():
             if not node.is_fully_expanded():
+                node, undo = node.expand(state)
+                path.append(undo)
                 return node
-            else:
-                node = node.best_child()
+            node = node.best_child()
+            path.append(state.apply_with_undo(node.parent.agent_type, node.action[0], node.action[1]))
         return node
     
+    @staticmethod
+    def _rewind(state: GameState, path: List[tuple]):
+        """Undo the moves of _descend, back to the root"""
+        while path:
+            state.undo_action(path.pop())
+    
     def _simulate(self, state: GameState, starting_agent: AgentType) -> float:
         """
         Simulation phase: random playout from current state
         Returns normalized result (0.0 to 1.0)
         """
-        sim_state = state.clone()
+        if NUMBA_AVAILABLE:
+            return self._normalize(self._rollout_compiled(state, starting_agent))
+        
+        sim_state = _acquire_state(state)
+        self._rollout_python(sim_state, starting_agent)
+        result = self._normalize(evaluate_state(sim_state, self.agent_type))
+        _release_state(sim_state)
+        return result
+    
+    def _simulate_batch(self, states: List[GameState], starting_agent: AgentType) -> List[float]:
+        """
+        Simulation phase for several states on one map, with all rollouts
+        and their evaluations in single compiled calls. The states are not
+        modified.
+        """
+        if not NUMBA_AVAILABLE:
+            return [self._simulate(state, starting_agent) for state in states]
+        
+        rows = [state.to_arrays() for state in states]
+        (agent_pos, agent_fuel, agent_nodes, node_owner, station_fuel,
+         station_active, station_counter) = (np.stack([row[i] for row in rows])
+                                             for i in (1, 2, 3, 4, 6, 7, 8))
+        _, _, _, _, _, node_pos, _, _, _, station_pos, adj_flat, adj_offsets = rows[0]
+        start_turns = np.array([state.turn for state in states], dtype=np.int32)
+        
+        mcts_rollout_batch(agent_pos, agent_fuel, agent_nodes, node_owner, node_pos,
+                           station_fuel, station_active, station_counter, station_pos,
+                           adj_flat, adj_offsets, AGENT_INDEX[starting_agent], start_turns,
+                           states[0].max_turns, CFG.MCTS_SIM_DEPTH, self._rules)
+        scores = evaluate_arrays_batch(agent_pos, agent_fuel, agent_nodes, node_owner, node_pos,
+                                       station_fuel, station_active, station_pos,
+                                       AGENT_INDEX[self.agent_type], DIST, states[0].grid_size,
+                                       SCORE_WEIGHTS)
+        # _normalize() on the whole batch
+        return (0.5 + 0.5 * np.tanh(scores * 0.01)).tolist()
+    
+    @staticmethod
+    def _normalize(score: float) -> float:
+        """Normalize a playout evaluation to (0.0, 1.0)"""
+        # Higher scores are better: the logistic sigmoid 1 / (1 + exp(-score / 50)),
+        # written as tanh (same curve, one fewer division, no exp overflow)
+        return 0.5 + 0.5 * math.tanh(score * 0.01)
+    
+    def _rollout_compiled(self, state: GameState, starting_agent: AgentType) -> float:
+        """
+        Play out a random game in the compiled kernel, on arrays copied from
+        `state`, and evaluate the result there too; returns the raw score
+        """
+        (_, agent_pos, agent_fuel, agent_nodes, node_owner, node_pos, station_fuel,
+         station_active, station_counter, station_pos, adj_flat, adj_offsets) = state.to_arrays()
+        
+        mcts_rollout(agent_pos, agent_fuel, agent_nodes, node_owner, node_pos,
+                     station_fuel, station_active, station_counter, station_pos,
+                     adj_flat, adj_offsets, AGENT_INDEX[starting_agent], state.turn,
+                     state.max_turns, CFG.MCTS_SIM_DEPTH, self._rules)
+        
+        return evaluate_arrays(agent_pos, agent_fuel, agent_nodes, node_owner, node_pos,
+                               station_fuel, station_active, station_pos,
+                               AGENT_INDEX[self.agent_type], DIST, state.grid_size, SCORE_WEIGHTS)
+    
+    def _rollout_python(self, sim_state: GameState, starting_agent: AgentType):
+        """
+        Play out a random game, in place on a scratch state. Every two plies
+        the playout stops early if one side leads by MCTS_DECISIVE_LEAD
+        nodes: the evaluation is nearly saturated by then.
+        """
         current_agent = starting_agent
-        max_sim_turns = config.MCTS_SIM_DEPTH  # Use configurable simulation depth
+        max_sim_turns = CFG.MCTS_SIM_DEPTH  # Use configurable simulation depth
+        decisive_lead = CFG.MCTS_DECISIVE_LEAD
+        strategist = sim_state.agents[AgentType.STRATEGIST]
+        instinct = sim_state.agents[AgentType.INSTINCT]
+        rand = self.rng.random
         
-        for _ in range(max_sim_turns):
+        for ply in range(max_sim_turns):
             if sim_state.is_game_over():
                 break
+            if (decisive_lead and ply % 2 == 0
+                    and abs(strategist.nodes_controlled - instinct.nodes_controlled) >= decisive_lead):
+                break
             
             # Get random action
             actions = self._get_quick_actions(sim_state, current_agent)
@@ -194,21 +676,11 @@ class MCTSAI:
             if not actions:
                 break
             
-            action = random.choice(actions)
+            action = actions[int(rand() * len(actions))]
             self._apply_action(sim_state, current_agent, action[0], action[1])
             
             # Switch player
-            current_agent = (AgentType.INSTINCT if current_agent == AgentType.STRATEGIST 
-                           else AgentType.STRATEGIST)
-        
-        # Evaluate final state
-        score = evaluate_state(sim_state, self.agent_type)
-        
-        # Normalize to [0, 1]
-        # Higher scores are better, use sigmoid-like normalization
-        normalized = 1.0 / (1.0 + math.exp(-score / 50.0))
-        
-        return normalized
+            current_agent = OPPONENT[current_agent]
     
     def _backpropagate(self, node: MCTSNode, result: float):
         """Backpropagation phase: update all ancestors"""
@@ -221,7 +693,7 @@ class MCTSAI:
             
             node = node.parent
     
-    def _get_quick_actions(self, state: GameState, agent_type: AgentType) -> List[Tuple[str, Optional[Position]]]:
+    def _get_quick_actions(self, state: GameState, agent_type: AgentType) -> List[Tuple[Action, Optional[int]]]:
         """Get possible actions quickly (for simulation)"""
         actions = []
         agent = state.agents[agent_type]
@@ -229,57 +701,56 @@ class MCTSAI:
         # Control node - highest priority
         node = state.can_control_node(agent_type)
         if node:
-            actions.append(("control_node", None))
+            actions.append((CONTROL_NODE, None))
         
         # Refuel when needed
-        if state.can_refuel(agent_type) and agent.fuel < config.MAX_FUEL * 0.5:
-            actions.append(("refuel", None))
+        if state.can_refuel(agent_type) and agent.fuel < CFG.MAX_FUEL * 0.5:
+            actions.append((REFUEL, None))
         
         # All possible moves for full exploration
         possible_moves = state.get_possible_moves(agent_type)
         for move_pos in possible_moves:
-            actions.append(("move", move_pos))
+            actions.append((MOVE, move_pos))
         
         return actions
     
     @staticmethod
     def _apply_action(state: GameState, agent_type: AgentType, 
-                     action_type: str, target: Optional[Position]):
+                     action_type: Action, target: Optional[int]):
         """Apply an action to the game state (static for simulation)"""
-        if action_type == "move":
+        if action_type == MOVE:
             agent = state.agents[agent_type]
-            agent.position = target
+            agent.pos = target
         
-        elif action_type == "refuel":
+        elif action_type == REFUEL:
             agent = state.agents[agent_type]
-            for station in state.fuel_stations:
-                if station.position == agent.position and station.is_active:
-                    fuel_gained = min(config.FUEL_REFUEL_AMOUNT, 
-                                     config.MAX_FUEL - agent.fuel,
-                                     station.fuel_remaining)
-                    agent.fuel += fuel_gained
-                    station.fuel_remaining -= fuel_gained
-                    
-                    if station.is_depleted():
-                        station.is_active = False
-                    break
+            station = state.station_by_pos.get(agent.pos)
+            if station is not None and station.is_active:
+                fuel_gained = min(CFG.FUEL_REFUEL_AMOUNT, 
+                                 CFG.MAX_FUEL - agent.fuel,
+                                 station.fuel_remaining)
+                agent.fuel += fuel_gained
+                station.fuel_remaining -= fuel_gained
+                
+                if station.is_depleted():
+                    station.is_active = False
         
-        elif action_type == "control_node":
+        elif action_type == CONTROL_NODE:
             agent = state.agents[agent_type]
-            for node in state.light_nodes:
-                if node.position == agent.position:
-                    if not node.is_controlled():
-                        agent.fuel -= config.FUEL_COST_CONTROL_EMPTY
-                        node.controlled_by = agent_type
-                        agent.nodes_controlled += 1
-                    elif node.controlled_by != agent_type:
-                        agent.fuel -= config.FUEL_COST_CAPTURE
-                        
-                        if node.controlled_by:
-                            state.agents[node.controlled_by].nodes_controlled -= 1
-                        
-                        node.controlled_by = agent_type
-                        agent.nodes_controlled += 1
-                    break
+            node = state.node_by_pos.get(agent.pos)
+            if node is not None:
+                if not node.is_controlled():
+                    agent.fuel -= CFG.FUEL_COST_CONTROL_EMPTY
+                    node.controlled_by = agent_type
+                    agent.nodes_controlled += 1
+                    state.unclaimed_nodes = state.unclaimed_nodes - {node.pos}
+                elif node.controlled_by != agent_type:
+                    agent.fuel -= CFG.FUEL_COST_CAPTURE
+                    
+                    if node.controlled_by:
+                        state.agents[node.controlled_by].nodes_controlled -= 1
+                    
+                    node.controlled_by = agent_type
+                    agent.nodes_controlled += 1
         
         state.next_turn()
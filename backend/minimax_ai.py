@@ -1,8 +1,52 @@
-import copy
-from typing import List, Tuple, Optional
-from game_state import GameState, AgentType, Position, CellType
-from scoring import evaluate_state
-import config
+import hashlib
+import json
+import os
+from functools import lru_cache
+from typing import Dict, List, Tuple, Optional
+from game_state import (GameState, AgentType, Action, MOVE, REFUEL, CONTROL_NODE,
+                        WAIT, OPPONENT, nearest_distances)
+from scoring import evaluate_state_bounds
+from config import CFG
+
+# Opening book written by precompute_openings.py
+OPENING_BOOK_PATH = os.path.join(os.path.dirname(__file__), "openings.json")
+
+# Transposition table entry flags
+TT_EXACT = 0
+TT_LOWER = 1  # Value is a lower bound (search failed high)
+TT_UPPER = 2  # Value is an upper bound (search failed low)
+
+# Evaluation cache entries kept before it is cleared
+EVAL_CACHE_LIMIT = 1 << 18
+
+# Transposition table entries kept across turns before it is cleared
+TT_LIMIT = 1 << 18
+
+def map_digest(state: GameState) -> str:
+    """Identify a generated map (the book only applies to the map it was built on)"""
+    return hashlib.sha1(state.grid.tobytes()).hexdigest()
+
+def book_key(state: GameState) -> str:
+    """
+    Process-stable key of a position for the opening book: turn, agent
+    positions and fuel, node owners, station fuel and the side to move
+    """
+    strategist = state.agents[AgentType.STRATEGIST]
+    instinct = state.agents[AgentType.INSTINCT]
+    owners = "".join("-" if n.controlled_by is None else n.controlled_by.value[0]
+                     for n in state.light_nodes)
+    stations = ",".join(str(s.fuel_remaining) for s in state.fuel_stations)
+    return (f"{state.turn}:{strategist.pos},{strategist.fuel}:{instinct.pos},{instinct.fuel}"
+            f":{owners}:{stations}:{state.current_player.value[0]}")
+
+@lru_cache(maxsize=None)
+def load_opening_book(path: str = OPENING_BOOK_PATH) -> Optional[Dict]:
+    """Load an opening book once per process; None if there isn't one"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
 
 class MinimaxAI:
     """
@@ -12,48 +56,116 @@ class MinimaxAI:
     
     def __init__(self, agent_type: AgentType):
         self.agent_type = agent_type
-        self.opponent_type = (AgentType.INSTINCT if agent_type == AgentType.STRATEGIST 
-                             else AgentType.STRATEGIST)
+        self.opponent_type = OPPONENT[agent_type]
         self.nodes_explored = 0
+        
+        # Zobrist hash -> (depth, value, flag, best action)
+        self.transposition_table: Dict[int, Tuple[int, float, int, Optional[Tuple[Action, Optional[int]]]]] = {}
+        
+        # Zobrist hash -> evaluate_state() value. The evaluation only depends
+        # on hashed fields, so entries stay valid across turns of a game.
+        self.eval_cache: Dict[int, float] = {}
+        
+        # Move ordering: up to two quiet actions that caused a cutoff, per
+        # remaining depth, and cutoff counts (weighted by depth) per action
+        self.killer_moves: List[List[Tuple[Action, Optional[int]]]] = []
+        self.history: Dict[Tuple[AgentType, Tuple[Action, Optional[int]]], int] = {}
+        
+        # Precomputed opening moves, only used on the map they were built for
+        book = load_opening_book()
+        if book is not None and book.get("agent") != agent_type.value:
+            book = None
+        self._book = book
+        self._book_grid = None  # Grid the map check below was last done for
+        self._book_matches = False
+    
+    def get_best_action(self, state: GameState) -> Tuple[Action, Optional[int]]:
+        """
+        Determine the best action, from the opening book if the position is
+        in it, otherwise with Minimax with Alpha-Beta pruning
+        Returns: (action_type, target_pkey)
+        """
+        book_action = self._book_action(state)
+        if book_action is not None:
+            self.nodes_explored = 0
+            return book_action
+        
+        return self.search(state, CFG.MINIMAX_DEPTH)
+    
+    def _book_action(self, state: GameState) -> Optional[Tuple[Action, Optional[int]]]:
+        """Look up the position in the opening book"""
+        if self._book is None:
+            return None
+        
+        if state.grid is not self._book_grid:
+            self._book_grid = state.grid
+            self._book_matches = map_digest(state) == self._book["map"]
+        if not self._book_matches:
+            return None
+        
+        action = self._book["moves"].get(book_key(state))
+        return None if action is None else (Action(action[0]), action[1])
     
-    def get_best_action(self, state: GameState) -> Tuple[str, Optional[Position]]:
+    def search(self, state: GameState, depth: int) -> Tuple[Action, Optional[int]]:
         """
-        Determine the best action using Minimax with Alpha-Beta pruning
-        Returns: (action_type, target_position)
+        Minimax search with Alpha-Beta pruning, iteratively deepened to the
+        given depth: each pass tries the previous pass's best action first
+        and reuses its transposition table, killers and history. The
+        table is also kept between turns: positions searched under last
+        turn's reply still hold their values and best actions.
+        Returns: (action_type, target_pkey)
         """
         self.nodes_explored = 0
+        if len(self.transposition_table) >= TT_LIMIT:
+            self.transposition_table.clear()
+        self.killer_moves = [[] for _ in range(depth + 1)]
+        self.history.clear()
         
-        best_score = float('-inf')
-        best_action = None
-        best_target = None
+        # Search mutates its own copy in place (make/unmake), never the caller's state
+        state = state.fast_clone()
         
         # Generate all possible actions
         actions = self._generate_actions(state, self.agent_type)
         
         if not actions:
-            return ("wait", None)
+            return (WAIT, None)
+        
+        best = None
+        for current_depth in range(1, depth + 1):
+            if best is not None:
+                actions.remove(best)
+                actions.insert(0, best)
+            best = self._search_root(state, actions, current_depth)
+        
+        return best
+    
+    def _search_root(self, state: GameState, actions: List[Tuple[Action, Optional[int]]],
+                     depth: int) -> Tuple[Action, Optional[int]]:
+        """One fixed-depth pass over the root actions; returns the best one"""
+        best_score = float('-inf')
+        best_action = None
         
         # Evaluate each action using minimax
-        for action_type, target in actions:
+        for action in actions:
             # Simulate action
-            next_state = state.clone()
-            self._apply_action(next_state, self.agent_type, action_type, target)
+            undo = state.apply_with_undo(self.agent_type, action[0], action[1])
             
-            # Minimax evaluation
+            # Minimax evaluation; only scores above the best so far matter,
+            # anything else may come back as a bound
             score = self._minimax(
-                next_state,
-                depth=config.MINIMAX_DEPTH - 1,
-                alpha=float('-inf'),
+                state,
+                depth=depth - 1,
+                alpha=best_score,
                 beta=float('inf'),
                 maximizing=False  # Next turn is opponent's
             )
+            state.undo_action(undo)
             
             if score > best_score:
                 best_score = score
-                best_action = action_type
-                best_target = target
+                best_action = action
         
-        return (best_action, best_target)
+        return best_action
     
     def _minimax(self, state: GameState, depth: int, alpha: float, beta: float, 
                  maximizing: bool) -> float:
@@ -64,80 +176,151 @@ class MinimaxAI:
         
         # Terminal conditions
         if depth == 0 or state.is_game_over():
-            return evaluate_state(state, self.agent_type)
+            return self._evaluate(state, alpha, beta)
+        
+        # Transposition table lookup - same position reached via another move order
+        key = state.zobrist
+        entry = self.transposition_table.get(key)
+        tt_action = None
+        if entry is not None:
+            stored_depth, value, flag, tt_action = entry
+            if stored_depth >= depth:
+                if flag == TT_EXACT:
+                    return value
+                elif flag == TT_LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                
+                if beta <= alpha:
+                    return value
         
+        alpha_orig, beta_orig = alpha, beta
+        value, best_action = self._search_children(state, depth, alpha, beta, maximizing, tt_action)
+        
+        if value <= alpha_orig:
+            flag = TT_UPPER
+        elif value >= beta_orig:
+            flag = TT_LOWER
+        else:
+            flag = TT_EXACT
+        self.transposition_table[key] = (depth, value, flag, best_action)
+        
+        return value
+    
+    def _search_children(self, state: GameState, depth: int, alpha: float, beta: float,
+                         maximizing: bool, tt_action: Optional[Tuple[Action, Optional[int]]] = None
+                         ) -> Tuple[float, Optional[Tuple[Action, Optional[int]]]]:
+        """
+        Expand all actions of the side to move with Alpha-Beta cutoffs.
+        Order: the transposition table's best action, killer moves, then the
+        heuristic order of _generate_actions reranked by history score.
+        Returns (value, best action).
+        """
         current_player = self.agent_type if maximizing else self.opponent_type
         actions = self._generate_actions(state, current_player)
         
         if not actions:
-            return evaluate_state(state, self.agent_type)
+            return self._evaluate(state), None
         
+        history = self.history
+        if history:
+            actions.sort(key=lambda a: history.get((current_player, a), 0), reverse=True)
+        killers = self.killer_moves[depth]
+        for killer in reversed(killers):
+            if killer in actions:
+                actions.remove(killer)
+                actions.insert(0, killer)
+        if tt_action is not None and tt_action in actions:
+            actions.remove(tt_action)
+            actions.insert(0, tt_action)
+        
+        best_action = None
         if maximizing:
             max_eval = float('-inf')
             
-            for action_type, target in actions:
-                next_state = state.clone()
-                self._apply_action(next_state, current_player, action_type, target)
-                
-                eval_score = self._minimax(next_state, depth - 1, alpha, beta, False)
-                max_eval = max(max_eval, eval_score)
+            for action in actions:
+                undo = state.apply_with_undo(current_player, action[0], action[1])
+                eval_score = self._minimax(state, depth - 1, alpha, beta, False)
+                state.undo_action(undo)
+                if eval_score > max_eval:
+                    max_eval = eval_score
+                    best_action = action
                 alpha = max(alpha, eval_score)
                 
                 if beta <= alpha:
+                    self._record_cutoff(current_player, action, depth)
                     break  # Beta cutoff
             
-            return max_eval
+            return max_eval, best_action
         else:
             min_eval = float('inf')
             
-            for action_type, target in actions:
-                next_state = state.clone()
-                self._apply_action(next_state, current_player, action_type, target)
-                
-                eval_score = self._minimax(next_state, depth - 1, alpha, beta, True)
-                min_eval = min(min_eval, eval_score)
+            for action in actions:
+                undo = state.apply_with_undo(current_player, action[0], action[1])
+                eval_score = self._minimax(state, depth - 1, alpha, beta, True)
+                state.undo_action(undo)
+                if eval_score < min_eval:
+                    min_eval = eval_score
+                    best_action = action
                 beta = min(beta, eval_score)
                 
                 if beta <= alpha:
+                    self._record_cutoff(current_player, action, depth)
                     break  # Alpha cutoff
             
-            return min_eval
+            return min_eval, best_action
+    
+    def _evaluate(self, state: GameState, alpha: float = float('-inf'),
+                  beta: float = float('inf')) -> float:
+        """
+        evaluate_state() for this agent, cached by Zobrist hash. Outside the
+        (alpha, beta) window a cheap bound may be returned instead (see
+        evaluate_state_bounds); only exact values are cached.
+        """
+        key = state.zobrist
+        value = self.eval_cache.get(key)
+        if value is None:
+            value, exact = evaluate_state_bounds(state, self.agent_type, alpha, beta)
+            if exact:
+                if len(self.eval_cache) >= EVAL_CACHE_LIMIT:
+                    self.eval_cache.clear()
+                self.eval_cache[key] = value
+        return value
+    
+    def _record_cutoff(self, player: AgentType, action: Tuple[Action, Optional[int]], depth: int):
+        """Update killer moves and history for an action that caused a cutoff"""
+        killers = self.killer_moves[depth]
+        if action not in killers:
+            killers.insert(0, action)
+            del killers[2:]
+        key = (player, action)
+        self.history[key] = self.history.get(key, 0) + depth * depth
     
-    def _generate_actions(self, state: GameState, agent_type: AgentType) -> List[Tuple[str, Optional[Position]]]:
-        """Generate all possible actions for the agent"""
-        actions = []
+    def _generate_actions(self, state: GameState, agent_type: AgentType) -> List[Tuple[Action, Optional[int]]]:
+        """Generate all possible actions for the agent, bucketed by type as found"""
         agent = state.agents[agent_type]
         
         # 1. Control/Capture node at current position - ALWAYS consider this
-        node = state.can_control_node(agent_type)
-        if node:
-            actions.append(("control_node", None))
+        control_actions = [(CONTROL_NODE, None)] if state.can_control_node(agent_type) else []
         
         # 2. Refuel at current position (consider when fuel is not full)
-        if state.can_refuel(agent_type) and agent.fuel < config.MAX_FUEL:
-            actions.append(("refuel", None))
+        refuel_actions = ([(REFUEL, None)]
+                          if state.can_refuel(agent_type) and agent.fuel < CFG.MAX_FUEL else [])
         
         # 3. Move to adjacent positions
-        possible_moves = state.get_possible_moves(agent_type)
-        for move_pos in possible_moves:
-            actions.append(("move", move_pos))
+        move_actions = [(MOVE, move_pos) for move_pos in state.get_possible_moves(agent_type)]
         
         # Prioritize strategic actions for alpha-beta efficiency
-        actions = self._prioritize_actions(state, agent_type, actions)
-        
-        return actions
+        return self._prioritize_actions(state, agent_type, control_actions,
+                                        refuel_actions, move_actions)
     
-    def _prioritize_actions(self, state: GameState, agent_type: AgentType, 
-                           actions: List[Tuple[str, Optional[Position]]]) -> List[Tuple[str, Optional[Position]]]:
+    def _prioritize_actions(self, state: GameState, agent_type: AgentType,
+                            control_actions: List[Tuple[Action, None]],
+                            refuel_actions: List[Tuple[Action, None]],
+                            move_actions: List[Tuple[Action, int]]) -> List[Tuple[Action, Optional[int]]]:
         """Prioritize actions based on strategic value for better alpha-beta pruning"""
         agent = state.agents[agent_type]
-        opponent_type = (AgentType.INSTINCT if agent_type == AgentType.STRATEGIST 
-                        else AgentType.STRATEGIST)
-        
-        # Separate actions by type
-        control_actions = [a for a in actions if a[0] == "control_node"]
-        refuel_actions = [a for a in actions if a[0] == "refuel"]
-        move_actions = [a for a in actions if a[0] == "move"]
         
         prioritized = []
         
@@ -145,7 +328,7 @@ class MinimaxAI:
         prioritized.extend(control_actions)
         
         # 2. Refuel if critically low (can't do anything without fuel)
-        if agent.fuel <= config.FUEL_COST_CONTROL_EMPTY:
+        if agent.fuel <= CFG.FUEL_COST_CONTROL_EMPTY:
             prioritized.extend(refuel_actions)
         
         # 3. Moves sorted by strategic value
@@ -153,95 +336,63 @@ class MinimaxAI:
         prioritized.extend(move_actions)
         
         # 4. Refuel if moderately low
-        if config.FUEL_COST_CONTROL_EMPTY < agent.fuel < config.MAX_FUEL * 0.5:
+        if CFG.FUEL_COST_CONTROL_EMPTY < agent.fuel < CFG.MAX_FUEL * 0.5:
             prioritized.extend(refuel_actions)
         
         return prioritized
     
     def _sort_moves_by_value(self, state: GameState, agent_type: AgentType,
-                            move_actions: List[Tuple[str, Position]]) -> List[Tuple[str, Position]]:
+                            move_actions: List[Tuple[Action, int]]) -> List[Tuple[Action, int]]:
         """Sort move actions by strategic value"""
         agent = state.agents[agent_type]
-        opponent_type = (AgentType.INSTINCT if agent_type == AgentType.STRATEGIST 
-                        else AgentType.STRATEGIST)
+        opponent_type = OPPONENT[agent_type]
+        control_cost = CFG.FUEL_COST_CONTROL_EMPTY
+        capture_cost = CFG.FUEL_COST_CAPTURE
+        
+        # Target positions are the same for every move, collect them once and
+        # look up (cached) distance-to-nearest fields for each set
+        unclaimed = state.unclaimed_nodes
+        opponent_nodes = (tuple(n.pos for n in state.light_nodes if n.controlled_by == opponent_type)
+                          if agent.fuel >= capture_cost else ())
+        active_stations = (tuple(fs.pos for fs in state.fuel_stations
+                                 if fs.is_active and not fs.is_depleted())
+                           if agent.fuel < CFG.MAX_FUEL * 0.3 else ())
+        unclaimed_dist = nearest_distances(unclaimed) if unclaimed else None
+        opponent_dist = nearest_distances(opponent_nodes) if opponent_nodes else None
+        station_dist = nearest_distances(active_stations) if active_stations else None
         
         def move_value(action):
             _, target = action
             value = 0
             
             # HIGH PRIORITY: Moves that put us ON a light node we can control
-            for node in state.light_nodes:
-                if node.position.x == target.x and node.position.y == target.y:
-                    if not node.is_controlled():
-                        if agent.fuel >= config.FUEL_COST_CONTROL_EMPTY:
-                            value += 100  # Can control next turn!
-                    elif node.controlled_by == opponent_type:
-                        if agent.fuel >= config.FUEL_COST_CAPTURE:
-                            value += 80  # Can capture next turn!
+            node = state.node_by_pos.get(target)
+            if node is not None:
+                if not node.is_controlled():
+                    if agent.fuel >= control_cost:
+                        value += 100  # Can control next turn!
+                elif node.controlled_by == opponent_type:
+                    if agent.fuel >= capture_cost:
+                        value += 80  # Can capture next turn!
             
             # Distance to unclaimed nodes
-            unclaimed = [n for n in state.light_nodes if not n.is_controlled()]
-            if unclaimed:
-                min_dist = min(target.distance_to(n.position) for n in unclaimed)
-                value += max(0, 30 - min_dist * 2)
+            if unclaimed_dist is not None:
+                bonus = 30 - unclaimed_dist[target] * 2
+                if bonus > 0:
+                    value += bonus
             
             # Distance to opponent nodes (for capturing)
-            opponent_nodes = [n for n in state.light_nodes if n.controlled_by == opponent_type]
-            if opponent_nodes and agent.fuel >= config.FUEL_COST_CAPTURE:
-                min_dist = min(target.distance_to(n.position) for n in opponent_nodes)
-                value += max(0, 25 - min_dist * 2)
+            if opponent_dist is not None:
+                bonus = 25 - opponent_dist[target] * 2
+                if bonus > 0:
+                    value += bonus
             
             # Move toward fuel station if low on fuel
-            if agent.fuel < config.MAX_FUEL * 0.3:
-                active_stations = [fs for fs in state.fuel_stations 
-                                  if fs.is_active and not fs.is_depleted()]
-                if active_stations:
-                    min_dist = min(target.distance_to(fs.position) for fs in active_stations)
-                    value += max(0, 20 - min_dist * 3)
+            if station_dist is not None:
+                bonus = 20 - station_dist[target] * 3
+                if bonus > 0:
+                    value += bonus
             
             return value
         
         return sorted(move_actions, key=move_value, reverse=True)
-    
-    def _apply_action(self, state: GameState, agent_type: AgentType, 
-                     action_type: str, target: Optional[Position]):
-        """Apply an action to the game state (for simulation)"""
-        if action_type == "move":
-            agent = state.agents[agent_type]
-            agent.position = target
-        
-        elif action_type == "refuel":
-            agent = state.agents[agent_type]
-            for station in state.fuel_stations:
-                if station.position == agent.position and station.is_active:
-                    fuel_gained = min(config.FUEL_REFUEL_AMOUNT, 
-                                     config.MAX_FUEL - agent.fuel,
-                                     station.fuel_remaining)
-                    agent.fuel += fuel_gained
-                    station.fuel_remaining -= fuel_gained
-                    
-                    if station.is_depleted():
-                        station.is_active = False
-                    break
-        
-        elif action_type == "control_node":
-            agent = state.agents[agent_type]
-            for node in state.light_nodes:
-                if node.position == agent.position:
-                    if not node.is_controlled():
-                        agent.fuel -= config.FUEL_COST_CONTROL_EMPTY
-                        node.controlled_by = agent_type
-                        agent.nodes_controlled += 1
-                    elif node.controlled_by != agent_type:
-                        agent.fuel -= config.FUEL_COST_CAPTURE
-                        
-                        # Update previous owner
-                        if node.controlled_by:
-                            state.agents[node.controlled_by].nodes_controlled -= 1
-                        
-                        node.controlled_by = agent_type
-                        agent.nodes_controlled += 1
-                    break
-        
-        # Advance turn
-        state.next_turn()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Precompute the Strategist's opening moves for a fixed map and write them to
+openings.json. MinimaxAI plays these without searching when the game is
+started on the same map (set MAP_SEED in config.py to the seed used here).
+
+Usage: python precompute_openings.py [--seed 0] [--plies 4] [--depth 6]
+"""
+
+import argparse
+import json
+import time
+from typing import Dict, List
+
+from game_state import GameState, AgentType, Action, MOVE, REFUEL, CONTROL_NODE
+from minimax_ai import MinimaxAI, OPENING_BOOK_PATH, book_key, map_digest
+
+def play(state: GameState, agent_type: AgentType, action_type: Action, target) -> GameState:
+    """Play an action the way the game loop does, on a copy"""
+    state = state.clone()
+    if action_type == MOVE:
+        state.execute_move(agent_type, target)
+    elif action_type == REFUEL:
+        state.execute_refuel(agent_type)
+    elif action_type == CONTROL_NODE:
+        state.execute_control_node(agent_type)
+    state.next_turn()
+    return state
+
+def build_book(seed: int, plies: int, depth: int) -> Dict:
+    """
+    Walk the first `plies` plies: the Strategist plays its searched move,
+    every reply of the opponent is followed
+    """
+    ai = MinimaxAI(AgentType.STRATEGIST)
+    opponent = AgentType.INSTINCT
+    moves: Dict[str, List] = {}
+
+    root = GameState(seed=seed, record_history=False)
+    frontier = [root]
+    for _ in range(plies + 1):
+        next_frontier = []
+        for state in frontier:
+            if state.is_game_over():
+                continue
+
+            if state.current_player == ai.agent_type:
+                key = book_key(state)
+                if key in moves:
+                    continue
+                action_type, target = ai.search(state, depth)
+                moves[key] = [action_type, target]
+                next_frontier.append(play(state, ai.agent_type, action_type, target))
+            else:
+                for action_type, target in ai._generate_actions(state, opponent):
+                    next_frontier.append(play(state, opponent, action_type, target))
+        frontier = next_frontier
+
+    return {
+        "agent": ai.agent_type.value,
+        "seed": seed,
+        "depth": depth,
+        "map": map_digest(root),
+        "moves": moves
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the Minimax opening book")
+    parser.add_argument("--seed", type=int, default=0, help="Map seed (use the same MAP_SEED in config.py)")
+    parser.add_argument("--plies", type=int, default=4, help="Opening plies to cover")
+    parser.add_argument("--depth", type=int, default=6, help="Minimax depth for book moves")
+    parser.add_argument("--output", default=OPENING_BOOK_PATH, help="Output file")
+    args = parser.parse_args()
+
+    start = time.time()
+    book = build_book(args.seed, args.plies, args.depth)
+    with open(args.output, "w") as f:
+        json.dump(book, f, indent=1)
+
+    print(f"Wrote {len(book['moves'])} positions to {args.output} in {time.time() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
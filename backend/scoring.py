@@ -1,178 +1,294 @@
-from game_state import GameState, AgentType, Position
-import config
+from typing import List, Optional, Tuple
+import numpy as np
+from game_state import GameState, Agent, AgentType, Position, OPPONENT, BLOCKS_SIGHT, DIST_ROWS
+from config import CFG
+
+# Config values read on every evaluation, bound once (CFG is frozen)
+SCORE_NODE_CONTROL = CFG.SCORE_NODE_CONTROL
+SCORE_FUEL_REMAINING = CFG.SCORE_FUEL_REMAINING
+SCORE_STRATEGIC_POSITION = CFG.SCORE_STRATEGIC_POSITION
+LOW_FUEL = CFG.MAX_FUEL * 0.3
+FUEL_COST_CAPTURE = CFG.FUEL_COST_CAPTURE
+CELLS = CFG.GRID_SIZE * CFG.GRID_SIZE
+
+# Strategic value of each cell by packed position: central cells are better
+_center = CFG.GRID_SIZE / 2
+POSITION_SCORE = [(CFG.GRID_SIZE - (abs(x - _center) + abs(y - _center))) * 0.5 * SCORE_STRATEGIC_POSITION
+                  for y in range(CFG.GRID_SIZE) for x in range(CFG.GRID_SIZE)]
+
+# Largest total of evaluate_state's position, unclaimed-node and fuel
+# station terms (none of them is ever negative)
+MAX_POSITION_BONUS = max(POSITION_SCORE) + 10 * 2 + 15
 
 def evaluate_state(state: GameState, agent_type: AgentType) -> float:
     """
     Evaluate the game state from the perspective of the given agent.
-    Higher scores are better for the agent.
+    Higher scores are better for the agent. All node terms come from one
+    pass over the light nodes.
     """
     agent = state.agents[agent_type]
-    opponent_type = AgentType.INSTINCT if agent_type == AgentType.STRATEGIST else AgentType.STRATEGIST
-    opponent = state.agents[opponent_type]
+    opponent = state.agents[OPPONENT[agent_type]]
+    agent_dist = DIST_ROWS[agent.pos]
+    
+    # Single pass over the nodes:
+    # - closest unclaimed node (10+ cells away earns nothing)
+    # - threats: opponent near our nodes
+    # - opportunities: us near the opponent's nodes, with fuel to capture
+    closest_unclaimed = 10
+    threat = 0.0
+    opportunity = 0.0
+    opponent_dist = DIST_ROWS[opponent.pos]
+    can_capture = agent.fuel >= FUEL_COST_CAPTURE
+    for node in state.light_nodes:
+        owner = node.controlled_by
+        if owner is None:
+            dist = agent_dist[node.pos]
+            if dist < closest_unclaimed:
+                closest_unclaimed = dist
+        elif owner == agent_type:
+            dist = opponent_dist[node.pos]
+            if dist <= 2:
+                threat += 15  # High threat
+            elif dist <= 4:
+                threat += 5   # Medium threat
+        elif can_capture:
+            dist = agent_dist[node.pos]
+            if dist <= 1:
+                opportunity += 20  # Can capture next turn!
+            elif dist <= 3:
+                opportunity += 8   # Good opportunity
     
+    return _combine_terms(state, agent, opponent, closest_unclaimed, threat, opportunity)
+
+def _evaluate_both(state: GameState) -> Tuple[float, float]:
+    """
+    evaluate_state() for the strategist and the instinct, sharing one pass
+    over the nodes: a node's distance to the agent that doesn't own it is
+    both the owner's threat and the other agent's opportunity
+    """
+    strategist = state.agents[AgentType.STRATEGIST]
+    instinct = state.agents[AgentType.INSTINCT]
+    s_dist = DIST_ROWS[strategist.pos]
+    i_dist = DIST_ROWS[instinct.pos]
+    s_can_capture = strategist.fuel >= FUEL_COST_CAPTURE
+    i_can_capture = instinct.fuel >= FUEL_COST_CAPTURE
+    
+    s_closest = i_closest = 10
+    s_threat = s_opportunity = i_threat = i_opportunity = 0.0
+    for node in state.light_nodes:
+        owner = node.controlled_by
+        if owner is None:
+            dist = s_dist[node.pos]
+            if dist < s_closest:
+                s_closest = dist
+            dist = i_dist[node.pos]
+            if dist < i_closest:
+                i_closest = dist
+        elif owner == AgentType.STRATEGIST:
+            dist = i_dist[node.pos]
+            if dist <= 2:
+                s_threat += 15
+            elif dist <= 4:
+                s_threat += 5
+            if i_can_capture:
+                if dist <= 1:
+                    i_opportunity += 20
+                elif dist <= 3:
+                    i_opportunity += 8
+        else:
+            dist = s_dist[node.pos]
+            if dist <= 2:
+                i_threat += 15
+            elif dist <= 4:
+                i_threat += 5
+            if s_can_capture:
+                if dist <= 1:
+                    s_opportunity += 20
+                elif dist <= 3:
+                    s_opportunity += 8
+    
+    return (_combine_terms(state, strategist, instinct, s_closest, s_threat, s_opportunity),
+            _combine_terms(state, instinct, strategist, i_closest, i_threat, i_opportunity))
+
+def _combine_terms(state: GameState, agent: Agent, opponent: Agent, closest_unclaimed: int,
+                   threat: float, opportunity: float) -> float:
+    """The rest of evaluate_state(), given the results of its node pass"""
+    fuel = agent.fuel
     score = 0.0
     
     # 1. Node control (MOST IMPORTANT - this determines the winner)
-    node_diff = agent.nodes_controlled - opponent.nodes_controlled
-    score += node_diff * config.SCORE_NODE_CONTROL * 3  # Triple weight for node control
+    nodes_controlled = agent.nodes_controlled
+    node_diff = nodes_controlled - opponent.nodes_controlled
+    score += node_diff * SCORE_NODE_CONTROL * 3  # Triple weight for node control
     
     # 2. Absolute node count bonus
-    score += agent.nodes_controlled * config.SCORE_NODE_CONTROL
+    score += nodes_controlled * SCORE_NODE_CONTROL
     
     # 3. Fuel remaining (important for future actions)
-    score += agent.fuel * config.SCORE_FUEL_REMAINING
-    score -= opponent.fuel * config.SCORE_FUEL_REMAINING * 0.3
+    score += fuel * SCORE_FUEL_REMAINING
+    score -= opponent.fuel * SCORE_FUEL_REMAINING * 0.3
     
-    # 4. Strategic positioning
-    position_score = evaluate_position(state, agent_type)
-    score += position_score * config.SCORE_STRATEGIC_POSITION
+    # 4. Strategic positioning: central positions are generally better
+    score += POSITION_SCORE[agent.pos]
     
     # 5. Proximity to unclaimed nodes (critical for expansion)
-    unclaimed_bonus = evaluate_unclaimed_nodes_proximity(state, agent_type)
-    score += unclaimed_bonus * 2  # Double weight - path to victory
+    score += (10 - closest_unclaimed) * 2  # Double weight - path to victory
     
-    # 6. Fuel station access
-    fuel_access_bonus = evaluate_fuel_station_access(state, agent_type)
-    score += fuel_access_bonus
+    # 6. Fuel station access, when fuel is low
+    if fuel < LOW_FUEL:
+        agent_dist = DIST_ROWS[agent.pos]
+        closest_station = None
+        for fs in state.fuel_stations:
+            if fs.is_active and fs.fuel_remaining > 0:
+                dist = agent_dist[fs.pos]
+                if closest_station is None or dist < closest_station:
+                    closest_station = dist
+        if closest_station is not None:
+            bonus = 15 - closest_station * 2
+            if bonus > 0:
+                score += bonus
     
     # 7. Threat assessment - penalize if opponent is near our nodes
-    threat_penalty = evaluate_threats(state, agent_type)
-    score -= threat_penalty
+    score -= threat
     
     # 8. Opportunity bonus - reward being near opponent's nodes
-    opportunity_bonus = evaluate_opportunities(state, agent_type)
-    score += opportunity_bonus
+    score += opportunity
     
     return score
 
-def evaluate_threats(state: GameState, agent_type: AgentType) -> float:
-    """Evaluate how threatened our controlled nodes are"""
-    opponent_type = AgentType.INSTINCT if agent_type == AgentType.STRATEGIST else AgentType.STRATEGIST
-    opponent = state.agents[opponent_type]
-    
-    threat = 0.0
-    
-    # Check distance from opponent to our nodes
-    our_nodes = [n for n in state.light_nodes if n.controlled_by == agent_type]
-    for node in our_nodes:
-        dist = opponent.position.distance_to(node.position)
-        if dist <= 2:
-            threat += 15  # High threat
-        elif dist <= 4:
-            threat += 5   # Medium threat
-    
-    return threat
-
-def evaluate_opportunities(state: GameState, agent_type: AgentType) -> float:
-    """Evaluate opportunities to capture opponent's nodes"""
-    agent = state.agents[agent_type]
-    opponent_type = AgentType.INSTINCT if agent_type == AgentType.STRATEGIST else AgentType.STRATEGIST
-    
-    opportunity = 0.0
-    
-    # Check distance to opponent's nodes
-    enemy_nodes = [n for n in state.light_nodes if n.controlled_by == opponent_type]
-    for node in enemy_nodes:
-        dist = agent.position.distance_to(node.position)
-        if dist <= 1 and agent.fuel >= config.FUEL_COST_CAPTURE:
-            opportunity += 20  # Can capture next turn!
-        elif dist <= 3 and agent.fuel >= config.FUEL_COST_CAPTURE:
-            opportunity += 8   # Good opportunity
-    
-    return opportunity
-
-def evaluate_position(state: GameState, agent_type: AgentType) -> float:
-    """Evaluate strategic value of agent's position"""
-    agent = state.agents[agent_type]
-    score = 0.0
-    
-    # Central positions are generally better
-    center = state.grid_size / 2
-    distance_from_center = abs(agent.position.x - center) + abs(agent.position.y - center)
-    score += (state.grid_size - distance_from_center) * 0.5
-    
-    return score
-
-def evaluate_unclaimed_nodes_proximity(state: GameState, agent_type: AgentType) -> float:
-    """Reward proximity to unclaimed nodes"""
+def evaluate_state_bounds(state: GameState, agent_type: AgentType,
+                          alpha: float, beta: float) -> Tuple[float, bool]:
+    """
+    evaluate_state() for an alpha-beta window. The node and fuel terms are
+    cheap; the rest is bounded by MAX_POSITION_BONUS plus 20 per opponent
+    node (opportunities) and 15 per own node (threats). If even the best
+    case is <= alpha, or the worst case >= beta, that bound is returned
+    without the full evaluation, which is all a fail-soft search needs.
+    Returns (value, exact).
+    """
     agent = state.agents[agent_type]
-    score = 0.0
-    
-    unclaimed_nodes = [node for node in state.light_nodes if not node.is_controlled()]
-    
-    if unclaimed_nodes:
-        # Find closest unclaimed node
-        min_distance = min(agent.position.distance_to(node.position) for node in unclaimed_nodes)
-        
-        # Closer is better
-        score += max(0, 10 - min_distance)
+    opponent = state.agents[OPPONENT[agent_type]]
+    nodes_controlled = agent.nodes_controlled
+    opponent_nodes = opponent.nodes_controlled
     
-    return score
-
-def evaluate_fuel_station_access(state: GameState, agent_type: AgentType) -> float:
-    """Reward proximity to active fuel stations when low on fuel"""
-    agent = state.agents[agent_type]
+    # Same terms, in the same order, as the start of evaluate_state
     score = 0.0
+    score += (nodes_controlled - opponent_nodes) * SCORE_NODE_CONTROL * 3
+    score += nodes_controlled * SCORE_NODE_CONTROL
+    score += agent.fuel * SCORE_FUEL_REMAINING
+    score -= opponent.fuel * SCORE_FUEL_REMAINING * 0.3
     
-    # If fuel is low, prioritize fuel station access
-    if agent.fuel < config.MAX_FUEL * 0.3:
-        active_stations = [fs for fs in state.fuel_stations if fs.is_active and not fs.is_depleted()]
-        
-        if active_stations:
-            min_distance = min(agent.position.distance_to(fs.position) for fs in active_stations)
-            score += max(0, 15 - min_distance * 2)
+    upper = score + MAX_POSITION_BONUS + 20 * opponent_nodes
+    if upper <= alpha:
+        return upper, False
+    lower = score - 15 * nodes_controlled
+    if lower >= beta:
+        return lower, False
     
-    return score
+    return evaluate_state(state, agent_type), True
 
 def evaluate_visibility(state: GameState, agent_type: AgentType) -> float:
     """Evaluate visibility advantages (windows, clear lines)"""
     agent = state.agents[agent_type]
-    opponent_type = AgentType.INSTINCT if agent_type == AgentType.STRATEGIST else AgentType.STRATEGIST
+    opponent_type = OPPONENT[agent_type]
     opponent = state.agents[opponent_type]
     
     score = 0.0
     
     # Check if agent has line of sight to opponent
-    if has_line_of_sight(state, agent.position, opponent.position):
+    if _cached_los(state, agent.pos, opponent.pos):
         score += 3
     
     return score
 
 def has_line_of_sight(state: GameState, pos1: Position, pos2: Position) -> bool:
     """Check if there's line of sight between two positions"""
-    # Simple implementation - check if path is clear
-    dx = 1 if pos2.x > pos1.x else -1 if pos2.x < pos1.x else 0
-    dy = 1 if pos2.y > pos1.y else -1 if pos2.y < pos1.y else 0
+    return _cached_los(state, pos1.key, pos2.key)
+
+def _cached_los(state: GameState, a: int, b: int) -> bool:
+    """
+    _los() between two packed positions, memoized in state.los_cache.
+    Line of sight is symmetric, so (a, b) and (b, a) share an entry.
+    """
+    key = a * CELLS + b if a < b else b * CELLS + a
+    runs, cache = state.line_of_sight_tables()
+    visible = cache.get(key)
+    if visible is None:
+        y0, x0 = divmod(a, state.grid_size)
+        y1, x1 = divmod(b, state.grid_size)
+        visible = cache[key] = _los(state.grid, runs, x0, y0, x1, y1)
+    return visible
+
+def _los(grid: np.ndarray, runs: Tuple[List[int], ...],
+         x0: int, y0: int, x1: int, y1: int) -> bool:
+    """
+    has_line_of_sight() on plain ints: no WALL or TREE on the cells crossed
+    by the segment between the two cell centers (endpoints not included).
+    Integer grid traversal after Amanatides & Woo, diagonally through exact
+    corners; straight stretches are checked in one step against `runs`
+    (GameState.clear_runs).
+    """
+    gs = grid.shape[1]
+    dx, dy = abs(x1 - x0), abs(y1 - y0)
+    step_x = (x1 > x0) - (x1 < x0)  # Sign of each axis (0 never steps that axis)
+    step_y = (y1 > y0) - (y1 < y0)
+    east, west, south, north = runs
+    run_x = east if step_x > 0 else west
+    run_y = south if step_y > 0 else north
     
-    current = Position(pos1.x, pos1.y)
+    # Which grid line comes next: > 0 a vertical one, < 0 a horizontal one,
+    # 0 both at once (tMaxX - tMaxY, scaled by 2 * dx * dy to stay integer)
+    error = dx - dy
+    dx *= 2
+    dy *= 2
     
-    while current != pos2:
-        current.x += dx if current.x != pos2.x else 0
-        current.y += dy if current.y != pos2.y else 0
+    x, y = x0, y0
+    while (x, y) != (x1, y1):
+        if error > 0:
+            # Steps along x until the error turns: all on this row
+            steps = min(-(-error // dy), abs(x1 - x)) if dy else abs(x1 - x)
+            x += step_x * steps
+            error -= dy * steps
+            clear = run_x[y * gs + x - step_x * steps]
+        elif error < 0:
+            steps = min(-(error // dx), abs(y1 - y)) if dx else abs(y1 - y)
+            y += step_y * steps
+            error += dx * steps
+            clear = run_y[(y - step_y * steps) * gs + x]
+        else:
+            x += step_x
+            y += step_y
+            error += dx - dy
+            if (x, y) == (x1, y1):
+                break
+            if (BLOCKS_SIGHT >> grid[y, x]) & 1:
+                return False
+            continue
         
-        if current == pos2:
-            break
-        
-        # Check for blocking obstacles
-        from game_state import CellType
-        cell = state.grid[current.y][current.x]
-        if cell in [CellType.WALL, CellType.TREE]:
+        # The cells stepped over must all be clear (the target itself needn't be)
+        if clear < steps - ((x, y) == (x1, y1)):
             return False
     
     return True
 
-def update_agent_score(state: GameState, agent_type: AgentType):
-    """Update the agent's score based on current state"""
+def update_agent_score(state: GameState, agent_type: AgentType, evaluation: Optional[float] = None):
+    """
+    Update the agent's score based on current state (`evaluation` is its
+    evaluate_state() value, if already known)
+    """
     agent = state.agents[agent_type]
     
     # Base score from evaluation
-    agent.score = int(evaluate_state(state, agent_type))
+    if evaluation is None:
+        evaluation = evaluate_state(state, agent_type)
+    agent.score = int(evaluation)
     
     # Additional bonus for efficiency
-    if agent.fuel > config.MAX_FUEL * 0.7:
-        agent.score += config.SCORE_FUEL_EFFICIENCY
+    if agent.fuel > CFG.MAX_FUEL * 0.7:
+        agent.score += CFG.SCORE_FUEL_EFFICIENCY
 
 def calculate_final_scores(state: GameState):
-    """Calculate final scores for both agents"""
-    for agent_type in [AgentType.STRATEGIST, AgentType.INSTINCT]:
-        update_agent_score(state, agent_type)
+    """Calculate final scores for both agents, from one shared evaluation pass"""
+    strategist_eval, instinct_eval = _evaluate_both(state)
+    update_agent_score(state, AgentType.STRATEGIST, strategist_eval)
+    update_agent_score(state, AgentType.INSTINCT, instinct_eval)
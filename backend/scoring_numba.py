@@ -0,0 +1,107 @@
+import numpy as np
+from game_state import GameState, AgentType, AGENT_INDEX, DIST
+from config import CFG
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # Compiled kernels are optional: callers (here and mcts_ai) check
+    # NUMBA_AVAILABLE and fall back to scoring.evaluate_state / Python rollouts
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+# Scoring weights passed to the kernels (globals would be frozen into the
+# cached machine code): [SCORE_NODE_CONTROL, SCORE_FUEL_REMAINING,
+# SCORE_STRATEGIC_POSITION, MAX_FUEL, FUEL_COST_CAPTURE]
+SCORE_WEIGHTS = np.array([
+    CFG.SCORE_NODE_CONTROL, CFG.SCORE_FUEL_REMAINING, CFG.SCORE_STRATEGIC_POSITION,
+    CFG.MAX_FUEL, CFG.FUEL_COST_CAPTURE
+], dtype=np.float64)
+
+@njit(cache=True, nogil=True)
+def evaluate_arrays(agent_pos, agent_fuel, agent_nodes, node_owner, node_pos,
+                    station_fuel, station_active, station_pos, me, dist, grid_size, weights):
+    """
+    scoring.evaluate_state on the flat arrays of GameState.to_arrays(), for
+    agent index `me`, with all of its sub-evaluators fused into one pass.
+    `dist` is game_state.DIST and `weights` is SCORE_WEIGHTS.
+    """
+    node_control, fuel_remaining, strategic_position, max_fuel, capture_cost = (
+        weights[0], weights[1], weights[2], weights[3], weights[4])
+    opp = 1 - me
+    pos = agent_pos[me]
+    fuel = agent_fuel[me]
+    opp_pos = agent_pos[opp]
+
+    # Node control, absolute node count and fuel
+    score = 0.0
+    score += (agent_nodes[me] - agent_nodes[opp]) * node_control * 3
+    score += agent_nodes[me] * node_control
+    score += fuel * fuel_remaining
+    score -= agent_fuel[opp] * fuel_remaining * 0.3
+
+    # Strategic positioning: central positions
+    center = grid_size / 2
+    y, x = pos // grid_size, pos % grid_size
+    score += (grid_size - (abs(x - center) + abs(y - center))) * 0.5 * strategic_position
+
+    # Nodes: nearest unclaimed one, threats to ours, opportunities on theirs
+    nearest_unclaimed = -1
+    threat = 0.0
+    opportunity = 0.0
+    for i in range(node_pos.shape[0]):
+        owner = node_owner[i]
+        if owner < 0:
+            d = int(dist[pos, node_pos[i]])
+            if nearest_unclaimed < 0 or d < nearest_unclaimed:
+                nearest_unclaimed = d
+        elif owner == me:
+            d = int(dist[opp_pos, node_pos[i]])
+            if d <= 2:
+                threat += 15
+            elif d <= 4:
+                threat += 5
+        elif fuel >= capture_cost:
+            d = int(dist[pos, node_pos[i]])
+            if d <= 1:
+                opportunity += 20
+            elif d <= 3:
+                opportunity += 8
+    if nearest_unclaimed >= 0:
+        score += max(0, 10 - nearest_unclaimed) * 2
+
+    # Fuel station access when low on fuel
+    if fuel < max_fuel * 0.3:
+        nearest_station = -1
+        for i in range(station_pos.shape[0]):
+            if station_active[i] and station_fuel[i] > 0:
+                d = int(dist[pos, station_pos[i]])
+                if nearest_station < 0 or d < nearest_station:
+                    nearest_station = d
+        if nearest_station >= 0:
+            score += max(0, 15 - nearest_station * 2)
+
+    score -= threat
+    score += opportunity
+    return score
+
+@njit(cache=True, nogil=True)
+def evaluate_arrays_batch(agent_pos, agent_fuel, agent_nodes, node_owner, node_pos,
+                          station_fuel, station_active, station_pos, me, dist, grid_size, weights):
+    """evaluate_arrays over a batch: the per-state arrays have a leading [batch] axis"""
+    scores = np.empty(agent_pos.shape[0], np.float64)
+    for b in range(agent_pos.shape[0]):
+        scores[b] = evaluate_arrays(agent_pos[b], agent_fuel[b], agent_nodes[b], node_owner[b], node_pos,
+                                    station_fuel[b], station_active[b], station_pos, me, dist,
+                                    grid_size, weights)
+    return scores
+
+def evaluate_state_compiled(state: GameState, agent_type: AgentType) -> float:
+    """evaluate_arrays for a GameState, e.g. to check it against scoring.evaluate_state"""
+    (_, agent_pos, agent_fuel, agent_nodes, node_owner, node_pos, station_fuel,
+     station_active, _, station_pos, _, _) = state.to_arrays()
+    return evaluate_arrays(agent_pos, agent_fuel, agent_nodes, node_owner, node_pos, station_fuel,
+                           station_active, station_pos, AGENT_INDEX[agent_type], DIST,
+                           state.grid_size, SCORE_WEIGHTS)
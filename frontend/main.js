@@ -15,6 +15,9 @@ class GameController {
         console.log('Connecting to WebSocket:', wsUrl);
         
         this.ws = new WebSocket(wsUrl);
+        // Server sends orjson-encoded binary frames
+        this.ws.binaryType = 'arraybuffer';
+        this.decoder = new TextDecoder();
         
         this.ws.onopen = () => {
             console.log('WebSocket connected');
@@ -23,7 +26,10 @@ class GameController {
         };
         
         this.ws.onmessage = (event) => {
-            const message = JSON.parse(event.data);
+            const text = typeof event.data === 'string'
+                ? event.data
+                : this.decoder.decode(event.data);
+            const message = JSON.parse(text);
             this.handleMessage(message);
         };
         
@@ -89,13 +95,40 @@ class GameController {
         uiController.updateTurn(state.turn, state.max_turns);
     }
     
+    applyChanges(changes) {
+        // Merge a per-turn delta from the server into the cached game state
+        const state = this.gameState;
+        
+        ['turn', 'current_player', 'is_game_over'].forEach(key => {
+            if (key in changes) {
+                state[key] = changes[key];
+            }
+        });
+        
+        if (changes.agents) {
+            Object.entries(changes.agents).forEach(([name, fields]) => {
+                Object.assign(state.agents[name], fields);
+            });
+        }
+        
+        (changes.fuel_stations || []).forEach(([index, fields]) => {
+            Object.assign(state.fuel_stations[index], fields);
+        });
+        
+        (changes.light_nodes || []).forEach(([index, controlledBy]) => {
+            state.light_nodes[index].controlled_by = controlledBy;
+        });
+        
+        return state;
+    }
+    
     handleAction(data) {
-        const { action, ai_info, ai_name, state } = data;
+        const { action, ai_info, ai_name, changes } = data;
         
         console.log('Action:', action, 'AI Info:', ai_info);
         
         // Update game state
-        this.gameState = state;
+        const state = this.applyChanges(changes);
         
         // Animate action in scene
         if (action.type === 'move') {
@@ -104,12 +137,11 @@ class GameController {
             gameScene.updateLightNode(action.position, action.agent);
         }
         
-        // Update fuel stations
-        if (state.fuel_stations) {
-            state.fuel_stations.forEach(fs => {
-                gameScene.updateFuelStation(fs.position, fs.is_active);
-            });
-        }
+        // Update fuel stations that changed this turn
+        (changes.fuel_stations || []).forEach(([index]) => {
+            const fs = state.fuel_stations[index];
+            gameScene.updateFuelStation(fs.position, fs.is_active);
+        });
         
         // Update UI
         uiController.updateAgentStats('strategist', state.agents.strategist);
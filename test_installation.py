@@ -4,6 +4,7 @@ Test script to verify Fuel Dominion installation and components
 Run this to check if everything is set up correctly
 """
 
+import argparse
 import sys
 import importlib
 from pathlib import Path
@@ -12,17 +13,17 @@ def test_python_version():
     """Check Python version"""
     print("✓ Testing Python version...")
     version = sys.version_info
-    if version.major == 3 and version.minor >= 8:
+    if version.major == 3 and version.minor >= 10:
         print(f"  ✓ Python {version.major}.{version.minor}.{version.micro} (OK)")
         return True
     else:
-        print(f"  ✗ Python {version.major}.{version.minor} (Need 3.8+)")
+        print(f"  ✗ Python {version.major}.{version.minor} (Need 3.10+)")
         return False
 
 def test_dependencies():
     """Check if required packages are installed"""
     print("\n✓ Testing dependencies...")
-    required = ['fastapi', 'uvicorn', 'websockets']
+    required = ['fastapi', 'uvicorn', 'websockets', 'orjson', 'numpy']
     all_good = True
     
     for package in required:
@@ -100,12 +101,13 @@ def test_game_state():
     sys.path.insert(0, str(Path(__file__).parent / 'backend'))
     
     try:
-        from game_state import GameState
+        from config import CFG
+        from game_state import GameState, WALL
         
         game = GameState()
         
         # Check basic properties
-        assert game.grid_size == 12, "Grid size should be 12"
+        assert game.grid_size == CFG.GRID_SIZE, f"Grid size should be {CFG.GRID_SIZE}"
         assert len(game.agents) == 2, "Should have 2 agents"
         assert game.turn == 0, "Should start at turn 0"
         assert len(game.light_nodes) > 0, "Should have light nodes"
@@ -116,15 +118,92 @@ def test_game_state():
         print(f"  ✓ Agents: {len(game.agents)}")
         print(f"  ✓ Light Nodes: {len(game.light_nodes)}")
         print(f"  ✓ Fuel Stations: {len(game.fuel_stations)}")
-        print(f"  ✓ Walls: {sum(1 for row in game.grid for cell in row if cell.value == 'wall')}")
+        print(f"  ✓ Walls: {int((game.grid == WALL).sum())}")
         
         return True
     except Exception as e:
         print(f"  ✗ Error: {str(e)}")
         return False
 
-def test_ai_algorithms():
-    """Test AI algorithm initialization"""
+def test_line_of_sight():
+    """Check line of sight on an empty grid with a single wall"""
+    print("\n✓ Testing line of sight...")
+    
+    sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+    
+    try:
+        from game_state import GameState, Position, EMPTY, WALL
+        from scoring import has_line_of_sight
+        
+        game = GameState()
+        game.grid[:] = EMPTY
+        game.grid[5, 3] = WALL
+        game._build_clear_runs()
+        
+        # Vertical (dx == 0), both directions
+        assert not has_line_of_sight(game, Position(3, 2), Position(3, 8)), "Wall should block vertical line"
+        assert not has_line_of_sight(game, Position(3, 8), Position(3, 2)), "Wall should block vertical line"
+        assert has_line_of_sight(game, Position(4, 2), Position(4, 8)), "Vertical line should be clear"
+        # Horizontal and diagonal
+        assert not has_line_of_sight(game, Position(0, 5), Position(6, 5)), "Wall should block horizontal line"
+        assert not has_line_of_sight(game, Position(1, 3), Position(5, 7)), "Wall should block diagonal line"
+        assert has_line_of_sight(game, Position(1, 4), Position(5, 8)), "Diagonal line should be clear"
+        # The endpoints themselves never block
+        assert has_line_of_sight(game, Position(3, 5), Position(3, 9)), "Start cell should not block"
+        
+        print("  ✓ Vertical, horizontal and diagonal lines")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {str(e)}")
+        return False
+
+def test_compiled_scoring():
+    """Check the compiled evaluator against scoring.evaluate_state on random positions"""
+    print("\n✓ Testing compiled scoring...")
+    
+    sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+    
+    try:
+        import random
+        from config import CFG
+        from game_state import GameState, AGENT_ORDER
+        from scoring import evaluate_state
+        from scoring_numba import NUMBA_AVAILABLE, evaluate_state_compiled
+        
+        rng = random.Random(0)
+        cells = CFG.GRID_SIZE * CFG.GRID_SIZE
+        for seed in range(5):
+            game = GameState(seed=seed, record_history=False)
+            for _ in range(20):
+                for agent in game.agents.values():
+                    agent.pos = rng.randrange(cells)
+                    agent.fuel = rng.randint(0, CFG.MAX_FUEL)
+                    agent.nodes_controlled = 0
+                for node in game.light_nodes:
+                    node.controlled_by = rng.choice((None,) + AGENT_ORDER)
+                    if node.controlled_by is not None:
+                        game.agents[node.controlled_by].nodes_controlled += 1
+                for station in game.fuel_stations:
+                    station.fuel_remaining = rng.randint(0, CFG.FUEL_STATION_INITIAL)
+                    station.is_active = station.fuel_remaining > 0
+                
+                for agent_type in AGENT_ORDER:
+                    expected = evaluate_state(game, agent_type)
+                    compiled = evaluate_state_compiled(game, agent_type)
+                    assert abs(compiled - expected) < 1e-9, \
+                        f"Compiled score {compiled} != {expected} for {agent_type.value}"
+        
+        print(f"  ✓ Matches evaluate_state ({'numba' if NUMBA_AVAILABLE else 'pure Python fallback'})")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {str(e)}")
+        return False
+
+def test_ai_algorithms(full: bool = False):
+    """
+    Test AI algorithm initialization; with `full`, also run a short
+    search with each (slow on first run: the compiled kernels are built)
+    """
     print("\n✓ Testing AI algorithms...")
     
     sys.path.insert(0, str(Path(__file__).parent / 'backend'))
@@ -134,19 +213,28 @@ def test_ai_algorithms():
         from minimax_ai import MinimaxAI
         from mcts_ai import MCTSAI
         
+        minimax = MinimaxAI(AgentType.STRATEGIST)
+        mcts = MCTSAI(AgentType.INSTINCT)
+        for ai in (minimax, mcts):
+            if not callable(getattr(ai, "get_best_action", None)):
+                print(f"  ✗ {type(ai).__name__} has no get_best_action()")
+                return False
+        
+        if not full:
+            print("  ✓ Minimax and MCTS AIs initialized (run with --full to search)")
+            return True
+        
         game = GameState()
         
-        # Test Minimax
-        minimax = MinimaxAI(AgentType.STRATEGIST)
-        action_m = minimax.get_best_action(game)
-        print(f"  ✓ Minimax AI initialized (explored {minimax.nodes_explored} nodes)")
+        # Test Minimax, one ply deep
+        action_m = minimax.search(game, 1)
+        print(f"  ✓ Minimax AI searched (explored {minimax.nodes_explored} nodes)")
         print(f"    Action: {action_m[0]}")
         
-        # Test MCTS
-        mcts = MCTSAI(AgentType.INSTINCT)
-        action_i = mcts.get_best_action(game)
-        print(f"  ✓ MCTS AI initialized (ran {mcts.simulations_run} simulations)")
-        print(f"    Action: {action_i[0]}")
+        # Test MCTS, a few simulations
+        root = mcts.search(game, 50)
+        print(f"  ✓ MCTS AI searched (ran {mcts.simulations_run} simulations, "
+              f"{len(root.children)} root actions)")
         
         return True
     except Exception as e:
@@ -157,6 +245,11 @@ def test_ai_algorithms():
 
 def main():
     """Run all tests"""
+    parser = argparse.ArgumentParser(description="Check the Fuel Dominion installation")
+    parser.add_argument("--full", action="store_true",
+                        help="Also run a short search with each AI (slower)")
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("  FUEL DOMINION - Installation Test")
     print("=" * 60)
@@ -168,7 +261,9 @@ def main():
     results.append(("File Structure", test_file_structure()))
     results.append(("Module Imports", test_imports()))
     results.append(("Game State", test_game_state()))
-    results.append(("AI Algorithms", test_ai_algorithms()))
+    results.append(("Line of Sight", test_line_of_sight()))
+    results.append(("Compiled Scoring", test_compiled_scoring()))
+    results.append(("AI Algorithms", test_ai_algorithms(args.full)))
     
     print("\n" + "=" * 60)
     print("  TEST SUMMARY")
@@ -195,7 +290,7 @@ def main():
         print("\nCommon fixes:")
         print("  - Install dependencies: pip install -r requirements.txt")
         print("  - Check file locations and names")
-        print("  - Ensure Python 3.8+ is installed")
+        print("  - Ensure Python 3.10+ is installed")
         return 1
 
 if __name__ == "__main__":